@@ -0,0 +1,130 @@
+"""Add incident stats rollups
+
+Revision ID: a8c1e5f7b9d3
+Revises: f3b7d9e1a5c2
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8c1e5f7b9d3'
+down_revision = 'f3b7d9e1a5c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    incidentstatus = postgresql.ENUM(name='incidentstatus', create_type=False)
+    incidentpriority = postgresql.ENUM(name='incidentpriority', create_type=False)
+    incidentcategory = postgresql.ENUM(name='incidentcategory', create_type=False)
+    # Both tables are append-only: every incident change adds rows of deltas
+    # and readers sum them. Writers never wait on each other's row locks, so
+    # one busy owner's writes don't queue up on its rows for today.
+    # crud.compact_incident_stats folds the deltas in from time to time.
+    op.create_table('incident_stats_rollup',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('owner_id', sa.Uuid(), nullable=False),
+    sa.Column('status', incidentstatus, nullable=False),
+    sa.Column('priority', incidentpriority, nullable=False),
+    sa.Column('category', incidentcategory, nullable=False),
+    sa.Column('incident_count', sa.Integer(), nullable=False),
+    sa.Column('resolved_count', sa.Integer(), nullable=False),
+    sa.Column('resolve_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_incident_stats_rollup_owner_id', 'incident_stats_rollup', ['owner_id'])
+    op.create_table('incident_daily_rollup',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('owner_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('opened', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_incident_daily_rollup_owner_id_day', 'incident_daily_rollup', ['owner_id', 'day'])
+
+    # Adds (sign = 1) or removes (sign = -1) one incident from the rollups
+    op.execute("""
+        CREATE FUNCTION apply_incident_stats(changed incident, sign integer)
+        RETURNS void AS $$
+        DECLARE
+            is_resolved boolean :=
+                changed.resolved_at IS NOT NULL AND changed.created_at IS NOT NULL;
+        BEGIN
+            INSERT INTO incident_stats_rollup (
+                owner_id, status, priority, category,
+                incident_count, resolved_count, resolve_seconds
+            )
+            VALUES (
+                changed.owner_id, changed.status, changed.priority, changed.category,
+                sign,
+                CASE WHEN is_resolved THEN sign ELSE 0 END,
+                CASE WHEN is_resolved
+                    THEN sign * extract(epoch FROM changed.resolved_at - changed.created_at)
+                    ELSE 0
+                END
+            );
+
+            IF changed.created_at IS NOT NULL THEN
+                INSERT INTO incident_daily_rollup (owner_id, day, opened, resolved)
+                VALUES (
+                    changed.owner_id, (changed.created_at AT TIME ZONE 'UTC')::date,
+                    sign, 0
+                );
+            END IF;
+            IF changed.resolved_at IS NOT NULL THEN
+                INSERT INTO incident_daily_rollup (owner_id, day, opened, resolved)
+                VALUES (
+                    changed.owner_id, (changed.resolved_at AT TIME ZONE 'UTC')::date,
+                    0, sign
+                );
+            END IF;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION incident_stats_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                PERFORM apply_incident_stats(OLD, -1);
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                PERFORM apply_incident_stats(NEW, 1);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_stats_insert_delete
+        AFTER INSERT OR DELETE ON incident
+        FOR EACH ROW EXECUTE FUNCTION incident_stats_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_stats_update
+        AFTER UPDATE ON incident
+        FOR EACH ROW WHEN (
+            (OLD.owner_id, OLD.status, OLD.priority, OLD.category,
+             OLD.created_at, OLD.resolved_at)
+            IS DISTINCT FROM
+            (NEW.owner_id, NEW.status, NEW.priority, NEW.category,
+             NEW.created_at, NEW.resolved_at)
+        )
+        EXECUTE FUNCTION incident_stats_trigger()
+    """)
+
+    # Existing incidents are counted by `python app/rebuild_incident_stats.py`
+    # afterwards, in batches and without blocking incident writes
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS incident_stats_update ON incident")
+    op.execute("DROP TRIGGER IF EXISTS incident_stats_insert_delete ON incident")
+    op.execute("DROP FUNCTION IF EXISTS incident_stats_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS apply_incident_stats(incident, integer)")
+    op.drop_table('incident_daily_rollup')
+    op.drop_table('incident_stats_rollup')
@@ -0,0 +1,51 @@
+"""Add email outbox
+
+Revision ID: b2d4f6a8c0e1
+Revises: a8c1e5f7b9d3
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c0e1'
+down_revision = 'a8c1e5f7b9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    emailstatus = sa.Enum('PENDING', 'SENT', 'FAILED', name='emailstatus')
+    emailstatus.create(op.get_bind(), checkfirst=True)
+
+    op.create_table('email_outbox',
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('email_to', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('subject', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('html_content', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('status', postgresql.ENUM(name='emailstatus', create_type=False), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_email_outbox_pending_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.create_index('ix_email_outbox_sent_at', 'email_outbox', ['sent_at'])
+
+
+def downgrade():
+    op.drop_index('ix_email_outbox_sent_at', table_name='email_outbox')
+    op.drop_index('ix_email_outbox_pending_next_attempt_at', table_name='email_outbox')
+    op.drop_table('email_outbox')
+    sa.Enum(name='emailstatus').drop(op.get_bind(), checkfirst=True)
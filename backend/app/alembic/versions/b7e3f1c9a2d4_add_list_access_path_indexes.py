@@ -0,0 +1,77 @@
+"""Add list access path indexes
+
+Revision ID: b7e3f1c9a2d4
+Revises: 05c4a70546c5
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f1c9a2d4'
+down_revision = '05c4a70546c5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_owner_id_created_at_id',
+            'incident',
+            ['owner_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_created_at_id',
+            'incident',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_assignee_id',
+            'incident',
+            ['assignee_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_comment_incident_id_created_at_id',
+            'comment',
+            ['incident_id', 'created_at', 'id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comment_incident_id_created_at_id',
+            table_name='comment',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_assignee_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_created_at_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_owner_id_created_at_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,92 @@
+"""Add incident filter indexes
+
+Revision ID: c4d8e2a6f1b3
+Revises: b7e3f1c9a2d4
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e2a6f1b3'
+down_revision = 'b7e3f1c9a2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_owner_id_status_priority_created_at',
+            'incident',
+            ['owner_id', 'status', sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_assignee_id_status_priority_created_at',
+            'incident',
+            ['assignee_id', 'status', sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_status_priority_created_at',
+            'incident',
+            ['status', sa.text('priority DESC'), sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_resolved_at',
+            'incident',
+            ['resolved_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # The assignee index above leads with assignee_id, so it serves
+        # assignee lookups as well
+        op.drop_index(
+            'ix_incident_assignee_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_assignee_id',
+            'incident',
+            ['assignee_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_resolved_at',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_status_priority_created_at',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_assignee_id_status_priority_created_at',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_owner_id_status_priority_created_at',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,184 @@
+"""Add incident comment count and last activity
+
+Revision ID: c9e1f3a5b7d2
+Revises: b2d4f6a8c0e1
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9e1f3a5b7d2'
+down_revision = 'b2d4f6a8c0e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Both defaults are constant for the statement, so existing rows are not
+    # rewritten. They start at 0 comments, active as of the migration, until
+    # `python app/repair_incident_activity.py` backfills them in batches.
+    op.add_column('incident', sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('incident', sa.Column('last_activity_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+
+    # Changes to the comment-derived columns alone are already announced by
+    # the comment events, so they must not also publish incident_updated
+    op.execute("DROP TRIGGER incident_event_update ON incident")
+    op.execute("""
+        CREATE TRIGGER incident_event_update
+        AFTER UPDATE ON incident
+        FOR EACH ROW WHEN (
+            (to_jsonb(OLD) - '{comment_count,last_activity_at}'::text[])
+            IS DISTINCT FROM (to_jsonb(NEW) - '{comment_count,last_activity_at}'::text[])
+        )
+        EXECUTE FUNCTION incident_event_trigger()
+    """)
+
+    # last_activity_at is the latest of created_at, updated_at and the
+    # comments' updated_at. Edits to the incident itself are folded in here.
+    op.execute("""
+        CREATE FUNCTION incident_activity_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                NEW.last_activity_at := coalesce(greatest(NEW.created_at, NEW.updated_at), now());
+            ELSIF NEW.updated_at IS DISTINCT FROM OLD.updated_at THEN
+                NEW.last_activity_at := greatest(NEW.last_activity_at, NEW.updated_at);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_activity
+        BEFORE INSERT OR UPDATE ON incident
+        FOR EACH ROW EXECUTE FUNCTION incident_activity_trigger()
+    """)
+
+    # Runs in the comment's transaction, so the count can't drift from the
+    # rows that are actually committed
+    op.execute("""
+        CREATE FUNCTION incident_comment_activity_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                UPDATE incident
+                SET comment_count = comment_count + 1,
+                    last_activity_at = greatest(last_activity_at, NEW.updated_at)
+                WHERE id = NEW.incident_id;
+            ELSIF TG_OP = 'DELETE' THEN
+                -- Matches nothing when the incident itself is being deleted.
+                -- The max is answered from ix_comment_incident_id_updated_at.
+                UPDATE incident
+                SET comment_count = comment_count - 1,
+                    last_activity_at = coalesce(
+                        greatest(
+                            created_at,
+                            updated_at,
+                            (SELECT max(updated_at) FROM comment WHERE incident_id = OLD.incident_id)
+                        ),
+                        last_activity_at
+                    )
+                WHERE id = OLD.incident_id;
+            ELSE
+                UPDATE incident
+                SET last_activity_at = greatest(last_activity_at, NEW.updated_at)
+                WHERE id = NEW.incident_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_comment_activity_insert_delete
+        AFTER INSERT OR DELETE ON comment
+        FOR EACH ROW EXECUTE FUNCTION incident_comment_activity_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_comment_activity_update
+        AFTER UPDATE OF updated_at ON comment
+        FOR EACH ROW WHEN (OLD.updated_at IS DISTINCT FROM NEW.updated_at)
+        EXECUTE FUNCTION incident_comment_activity_trigger()
+    """)
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_owner_id_last_activity_at_id',
+            'incident',
+            ['owner_id', sa.text('last_activity_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_incident_last_activity_at_id',
+            'incident',
+            [sa.text('last_activity_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Build the wider version index before dropping the old one, so
+        # ETag checks never lose their index-only scan
+        op.create_index(
+            'ix_incident_id_version_activity',
+            'incident',
+            ['id'],
+            postgresql_include=['owner_id', 'updated_at', 'last_activity_at', 'comment_count'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_id_version',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("ALTER INDEX ix_incident_id_version_activity RENAME TO ix_incident_id_version")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_id_version_base',
+            'incident',
+            ['id'],
+            postgresql_include=['owner_id', 'updated_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_id_version',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_last_activity_at_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_owner_id_last_activity_at_id',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.execute("ALTER INDEX ix_incident_id_version_base RENAME TO ix_incident_id_version")
+
+    op.execute("DROP TRIGGER IF EXISTS incident_comment_activity_update ON comment")
+    op.execute("DROP TRIGGER IF EXISTS incident_comment_activity_insert_delete ON comment")
+    op.execute("DROP FUNCTION IF EXISTS incident_comment_activity_trigger()")
+    op.execute("DROP TRIGGER IF EXISTS incident_activity ON incident")
+    op.execute("DROP FUNCTION IF EXISTS incident_activity_trigger()")
+
+    op.execute("DROP TRIGGER incident_event_update ON incident")
+    op.execute("""
+        CREATE TRIGGER incident_event_update
+        AFTER UPDATE ON incident
+        FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+        EXECUTE FUNCTION incident_event_trigger()
+    """)
+
+    op.drop_column('incident', 'last_activity_at')
+    op.drop_column('incident', 'comment_count')
@@ -0,0 +1,67 @@
+"""Add incident full text search
+
+Revision ID: d1f5a8b3c7e9
+Revises: c4d8e2a6f1b3
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1f5a8b3c7e9'
+down_revision = 'c4d8e2a6f1b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Adding a stored generated column rewrites the incident table
+    op.add_column('incident', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "to_tsvector('english'::regconfig, "
+            "coalesce(title, '') || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_search_vector',
+            'incident',
+            ['search_vector'],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_comment_search_vector',
+            'comment',
+            [sa.text("to_tsvector('english'::regconfig, content)")],
+            postgresql_using='gin',
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comment_search_vector',
+            table_name='comment',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_search_vector',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('incident', 'search_vector')
@@ -0,0 +1,36 @@
+"""Add incident event transaction ids
+
+Revision ID: d5a7c9e1f3b5
+Revises: c9e1f3a5b7d2
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a7c9e1f3b5'
+down_revision = 'c9e1f3a5b7d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Event ids are drawn when the row is inserted, not when it commits, so a
+    # lower id can become visible after a higher one. Recording the writing
+    # transaction lets readers stop at the oldest one still in progress.
+    # Existing events all come from finished transactions, and a constant
+    # default avoids rewriting the table.
+    op.add_column('incident_event', sa.Column('xid', sa.BigInteger(), server_default='0', nullable=False))
+    op.alter_column(
+        'incident_event',
+        'xid',
+        server_default=sa.text('pg_current_xact_id()::text::bigint'),
+    )
+    op.create_index('ix_incident_event_xid_id', 'incident_event', ['xid', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_incident_event_xid_id', table_name='incident_event')
+    op.drop_column('incident_event', 'xid')
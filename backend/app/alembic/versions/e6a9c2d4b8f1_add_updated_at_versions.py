@@ -0,0 +1,71 @@
+"""Add updated_at versions to incident and comment
+
+Revision ID: e6a9c2d4b8f1
+Revises: d1f5a8b3c7e9
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a9c2d4b8f1'
+down_revision = 'd1f5a8b3c7e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # now() is evaluated once, so existing rows get the migration time
+    # without rewriting the tables
+    op.add_column('incident', sa.Column(
+        'updated_at',
+        sa.DateTime(timezone=True),
+        server_default=sa.func.now(),
+        nullable=True,
+    ))
+    op.add_column('comment', sa.Column(
+        'updated_at',
+        sa.DateTime(timezone=True),
+        server_default=sa.func.now(),
+        nullable=True,
+    ))
+    op.alter_column('incident', 'updated_at', server_default=None)
+    op.alter_column('comment', 'updated_at', server_default=None)
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_incident_id_version',
+            'incident',
+            ['id'],
+            postgresql_include=['owner_id', 'updated_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_comment_incident_id_updated_at',
+            'comment',
+            ['incident_id', 'updated_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comment_incident_id_updated_at',
+            table_name='comment',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_incident_id_version',
+            table_name='incident',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('comment', 'updated_at')
+    op.drop_column('incident', 'updated_at')
@@ -0,0 +1,43 @@
+"""Add email outbox sending status
+
+Revision ID: e7b9d1f3a5c7
+Revises: d5a7c9e1f3b5
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b9d1f3a5c7'
+down_revision = 'd5a7c9e1f3b5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A new enum value can't be used in the transaction that added it
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE emailstatus ADD VALUE IF NOT EXISTS 'SENDING' AFTER 'PENDING'")
+
+    # Workers claim expired SENDING rows as well as PENDING ones
+    op.create_index(
+        'ix_email_outbox_due_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('PENDING', 'SENDING')"),
+    )
+    op.drop_index('ix_email_outbox_pending_next_attempt_at', table_name='email_outbox')
+
+
+def downgrade():
+    # Postgres can't drop an enum value, so SENDING stays in the type unused
+    op.execute("UPDATE email_outbox SET status = 'PENDING' WHERE status = 'SENDING'")
+    op.create_index(
+        'ix_email_outbox_pending_next_attempt_at',
+        'email_outbox',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+    op.drop_index('ix_email_outbox_due_next_attempt_at', table_name='email_outbox')
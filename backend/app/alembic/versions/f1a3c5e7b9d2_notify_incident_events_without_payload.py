@@ -0,0 +1,51 @@
+"""Notify incident events without a payload
+
+Revision ID: f1a3c5e7b9d2
+Revises: e7b9d1f3a5c7
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a3c5e7b9d2'
+down_revision = 'e7b9d1f3a5c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Listeners read events back from the table, so the notification only
+    # has to wake them up. With a constant payload Postgres folds all of a
+    # transaction's notifications into one.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION publish_incident_event(
+            event_kind text, event_incident_id uuid, event_comment_id uuid,
+            event_owner_id uuid
+        ) RETURNS void AS $$
+        BEGIN
+            INSERT INTO incident_event (kind, incident_id, comment_id, owner_id, created_at)
+            VALUES (event_kind, event_incident_id, event_comment_id, event_owner_id, now());
+            PERFORM pg_notify('incident_events', '');
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+
+
+def downgrade():
+    op.execute("""
+        CREATE OR REPLACE FUNCTION publish_incident_event(
+            event_kind text, event_incident_id uuid, event_comment_id uuid,
+            event_owner_id uuid
+        ) RETURNS void AS $$
+        DECLARE
+            event incident_event;
+        BEGIN
+            INSERT INTO incident_event (kind, incident_id, comment_id, owner_id, created_at)
+            VALUES (event_kind, event_incident_id, event_comment_id, event_owner_id, now())
+            RETURNING * INTO event;
+            PERFORM pg_notify('incident_events', row_to_json(event)::text);
+        END;
+        $$ LANGUAGE plpgsql
+    """)
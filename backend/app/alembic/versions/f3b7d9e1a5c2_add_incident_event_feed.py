@@ -0,0 +1,125 @@
+"""Add incident event feed
+
+Revision ID: f3b7d9e1a5c2
+Revises: e6a9c2d4b8f1
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b7d9e1a5c2'
+down_revision = 'e6a9c2d4b8f1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('incident_event',
+    sa.Column('incident_id', sa.Uuid(), nullable=False),
+    sa.Column('comment_id', sa.Uuid(), nullable=True),
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False),
+    sa.Column('owner_id', sa.Uuid(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_incident_event_created_at', 'incident_event', ['created_at'])
+
+    # Each change is logged so streams can resume from an event id, then
+    # broadcast; NOTIFY is only delivered once the transaction commits
+    op.execute("""
+        CREATE FUNCTION publish_incident_event(
+            event_kind text, event_incident_id uuid, event_comment_id uuid,
+            event_owner_id uuid
+        ) RETURNS void AS $$
+        DECLARE
+            event incident_event;
+        BEGIN
+            INSERT INTO incident_event (kind, incident_id, comment_id, owner_id, created_at)
+            VALUES (event_kind, event_incident_id, event_comment_id, event_owner_id, now())
+            RETURNING * INTO event;
+            PERFORM pg_notify('incident_events', row_to_json(event)::text);
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION incident_event_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                PERFORM publish_incident_event('incident_deleted', OLD.id, NULL, OLD.owner_id);
+            ELSE
+                PERFORM publish_incident_event(
+                    'incident_' || CASE TG_OP WHEN 'INSERT' THEN 'created' ELSE 'updated' END,
+                    NEW.id, NULL, NEW.owner_id
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE FUNCTION comment_event_trigger() RETURNS trigger AS $$
+        DECLARE
+            changed comment;
+            incident_owner_id uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                changed := OLD;
+            ELSE
+                changed := NEW;
+            END IF;
+            -- Comments removed by an incident's cascade delete are covered by
+            -- the incident_deleted event
+            SELECT owner_id INTO incident_owner_id FROM incident WHERE id = changed.incident_id;
+            IF incident_owner_id IS NOT NULL THEN
+                PERFORM publish_incident_event(
+                    'comment_' || CASE TG_OP
+                        WHEN 'INSERT' THEN 'created'
+                        WHEN 'UPDATE' THEN 'updated'
+                        ELSE 'deleted'
+                    END,
+                    changed.incident_id, changed.id, incident_owner_id
+                );
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_event_insert_delete
+        AFTER INSERT OR DELETE ON incident
+        FOR EACH ROW EXECUTE FUNCTION incident_event_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER incident_event_update
+        AFTER UPDATE ON incident
+        FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+        EXECUTE FUNCTION incident_event_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER comment_event_insert_delete
+        AFTER INSERT OR DELETE ON comment
+        FOR EACH ROW EXECUTE FUNCTION comment_event_trigger()
+    """)
+    op.execute("""
+        CREATE TRIGGER comment_event_update
+        AFTER UPDATE ON comment
+        FOR EACH ROW WHEN (OLD.* IS DISTINCT FROM NEW.*)
+        EXECUTE FUNCTION comment_event_trigger()
+    """)
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS comment_event_update ON comment")
+    op.execute("DROP TRIGGER IF EXISTS comment_event_insert_delete ON comment")
+    op.execute("DROP TRIGGER IF EXISTS incident_event_update ON incident")
+    op.execute("DROP TRIGGER IF EXISTS incident_event_insert_delete ON incident")
+    op.execute("DROP FUNCTION IF EXISTS comment_event_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS incident_event_trigger()")
+    op.execute("DROP FUNCTION IF EXISTS publish_incident_event(text, uuid, uuid, uuid)")
+    op.drop_index('ix_incident_event_created_at', table_name='incident_event')
+    op.drop_table('incident_event')
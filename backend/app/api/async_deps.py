@@ -0,0 +1,31 @@
+from collections.abc import AsyncGenerator
+from typing import Annotated
+
+from fastapi import Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.api.deps import TokenDep, cache_auth_user, check_active, get_token_user_id
+from app.core.async_db import async_engine
+from app.core.user_cache import get_user_cache
+from app.models import User, UserAuth
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+async def get_current_auth_user_async(
+    session: AsyncSessionDep, token: TokenDep
+) -> UserAuth:
+    user_id = get_token_user_id(token)
+    auth_user = get_user_cache().get(user_id)
+    if auth_user is None:
+        auth_user = cache_auth_user(await session.get(User, user_id))
+    return check_active(auth_user)
+
+
+AsyncCurrentAuthUser = Annotated[UserAuth, Depends(get_current_auth_user_async)]
@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy import literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlmodel import Session, func, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import settings
+from app.models import CountStrategy
+
+_CACHE_MAX_ENTRIES = 1024
+
+_cache: OrderedDict[str, tuple[float, int]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class _Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: SelectOfScalar[Any]) -> None:
+        self.statement = statement
+
+
+@compiles(_Explain)
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kw: Any) -> str:
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.statement, **kw)}"
+
+
+def _exact_count(session: Session, statement: SelectOfScalar[Any]) -> int:
+    count_statement = statement.with_only_columns(
+        func.count(), maintain_column_froms=True
+    ).order_by(None)
+    return int(session.scalars(count_statement).one())
+
+
+def _capped_count(session: Session, statement: SelectOfScalar[Any], cap: int) -> int:
+    limited = (
+        statement.with_only_columns(literal_column("1"), maintain_column_froms=True)
+        .order_by(None)
+        .limit(cap + 1)
+        .subquery()
+    )
+    return int(session.exec(select(func.count()).select_from(limited)).one())
+
+
+def _estimated_count(session: Session, statement: SelectOfScalar[Any]) -> int:
+    plan = session.connection().execute(_Explain(statement.order_by(None))).scalar_one()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _cache_key(session: Session, statement: SelectOfScalar[Any]) -> str:
+    compiled = statement.compile(dialect=session.get_bind().dialect)
+    return f"{compiled}|{sorted(compiled.params.items())}"
+
+
+def _cached_count(
+    session: Session, statement: SelectOfScalar[Any]
+) -> tuple[int, CountStrategy]:
+    key = _cache_key(session, statement)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > now:
+            return hit[1], CountStrategy.CACHED
+    count = _exact_count(session, statement)
+    with _cache_lock:
+        _cache[key] = (now + settings.LIST_COUNT_CACHE_TTL_SECONDS, count)
+        _cache.move_to_end(key)
+        while len(_cache) > _CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return count, CountStrategy.EXACT
+
+
+def clear_count_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
+def count_rows(
+    session: Session, statement: SelectOfScalar[Any]
+) -> tuple[int, CountStrategy]:
+    """
+    Count the rows matched by a list statement using the configured strategy.
+
+    Returns the count together with the strategy that actually produced it, so
+    an estimate that turns out to be small is upgraded to an exact count.
+    """
+    strategy = CountStrategy(settings.LIST_COUNT_STRATEGY)
+    cap = settings.LIST_COUNT_CAP
+    if strategy == CountStrategy.CAPPED:
+        count = _capped_count(session, statement, cap)
+        if count > cap:
+            return cap, CountStrategy.CAPPED
+        return count, CountStrategy.EXACT
+    if strategy == CountStrategy.ESTIMATE:
+        estimate = _estimated_count(session, statement)
+        if estimate > cap:
+            return estimate, CountStrategy.ESTIMATE
+        return _exact_count(session, statement), CountStrategy.EXACT
+    if strategy == CountStrategy.CACHED:
+        return _cached_count(session, statement)
+    return _exact_count(session, statement), CountStrategy.EXACT
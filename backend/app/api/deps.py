@@ -1,3 +1,4 @@
+import uuid
 from collections.abc import Generator
 from typing import Annotated
 
@@ -11,7 +12,9 @@ from sqlmodel import Session
 from app.core import security
 from app.core.config import settings
 from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.replicas import get_read_engine
+from app.core.user_cache import get_user_cache
+from app.models import TokenPayload, User, UserAuth
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -27,29 +30,67 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def get_token_user_id(token: str) -> uuid.UUID:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
         token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
+        return uuid.UUID(token_data.sub)
+    except (InvalidTokenError, ValidationError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+
+def cache_auth_user(user: User | None) -> UserAuth:
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if not user.is_active:
+    auth_user = UserAuth.model_validate(user)
+    get_user_cache().set(auth_user)
+    return auth_user
+
+
+def check_active(auth_user: UserAuth) -> UserAuth:
+    if not auth_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
+    return auth_user
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    with Session(get_read_engine()) as session:
+        yield session
+
+
+ReadSessionDep = Annotated[Session, Depends(get_read_db)]
+
+
+def get_current_auth_user(session: SessionDep, token: TokenDep) -> UserAuth:
+    user_id = get_token_user_id(token)
+    auth_user = get_user_cache().get(user_id)
+    if auth_user is None:
+        # Always the primary, even for requests served from a replica: a
+        # replica that is behind would cache a deactivated or demoted user
+        # for the cache TTL after invalidate_user has run
+        auth_user = cache_auth_user(session.get(User, user_id))
+    return check_active(auth_user)
+
+
+CurrentAuthUser = Annotated[UserAuth, Depends(get_current_auth_user)]
+
+
+def get_current_user(session: SessionDep, auth_user: CurrentAuthUser) -> User:
+    user = session.get(User, auth_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_active_superuser(current_user: CurrentAuthUser) -> UserAuth:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -0,0 +1,69 @@
+import uuid
+from datetime import datetime
+from typing import Annotated
+
+from fastapi import Header, HTTPException, Response
+from sqlmodel import Session, select
+
+from app.models import Incident, UserAuth
+
+IfNoneMatch = Annotated[str | None, Header()]
+
+# Comments change an incident's count and activity time but not updated_at
+IncidentVersion = tuple[datetime | None, datetime | None, int]
+
+
+def weak_etag(*parts: object) -> str:
+    """Build a weak ETag from version parts, e.g. `updated_at` timestamps."""
+    tokens = [
+        str(int(part.timestamp() * 1_000_000))
+        if isinstance(part, datetime)
+        else str(part)
+        for part in parts
+    ]
+    return f'W/"{"-".join(tokens)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip() for candidate in if_none_match.split(",")}
+    if "*" in candidates:
+        return True
+    return etag.removeprefix("W/") in {
+        candidate.removeprefix("W/") for candidate in candidates
+    }
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def incident_version(incident: Incident) -> IncidentVersion:
+    return incident.updated_at, incident.last_activity_at, incident.comment_count
+
+
+def get_incident_version(
+    session: Session, current_user: UserAuth, incident_id: uuid.UUID
+) -> IncidentVersion:
+    """
+    Look up an incident's version with the same 404/403 checks as reading it.
+
+    Only columns covered by ix_incident_id_version are selected, so Postgres
+    can answer from the index without touching the table.
+    """
+    row = session.exec(
+        select(
+            Incident.owner_id,
+            Incident.updated_at,
+            Incident.last_activity_at,
+            Incident.comment_count,
+        ).where(Incident.id == incident_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Incident not found")
+    owner_id, updated_at, last_activity_at, comment_count = row
+    if not current_user.is_superuser and (owner_id != current_user.id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return updated_at, last_activity_at, comment_count
@@ -4,6 +4,12 @@ from app.api.routes import comments, incidents, login, private, users, utils
 from app.core.config import settings
 
 api_router = APIRouter()
+
+if settings.ASYNC_DB:
+    from app.api.routes import async_routes
+
+    api_router.include_router(async_routes.router)
+
 api_router.include_router(login.router)
 api_router.include_router(users.router)
 api_router.include_router(utils.router)
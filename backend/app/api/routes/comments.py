@@ -1,84 +1,285 @@
 import uuid
-from typing import Any
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Annotated, Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import ColumnElement, insert, literal, true, tuple_
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql.dml import ReturningInsert
+from sqlmodel import col, delete, select
+from sqlmodel.sql.expression import Select
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Comment, CommentCreate, CommentPublic, CommentsPublic, Incident, Message
+from app.api.deps import (
+    CurrentAuthUser,
+    ReadSessionDep,
+    SessionDep,
+)
+from app.api.etag import (
+    IfNoneMatch,
+    IncidentVersion,
+    etag_matches,
+    get_incident_version,
+    not_modified,
+    weak_etag,
+)
+from app.api.pagination import decode_cursor, encode_cursor
+from app.models import (
+    Comment,
+    CommentCreate,
+    CommentPublic,
+    CommentsPublic,
+    CountStrategy,
+    Incident,
+    Message,
+    UserAuth,
+)
 
 router = APIRouter(prefix="/incidents/{incident_id}/comments", tags=["comments"])
 
+_COMMENT_COLUMNS = ("id", "content", "author_id", "created_at", "updated_at")
 
-def _get_incident_or_404(
-    session: SessionDep, current_user: CurrentUser, incident_id: uuid.UUID
-) -> Incident:
-    incident = session.get(Incident, incident_id)
-    if not incident:
+
+def _visible_to(current_user: UserAuth) -> list[ColumnElement[bool]]:
+    if current_user.is_superuser:
+        return []
+    return [col(Incident.owner_id) == current_user.id]
+
+
+@dataclass
+class CommentsQuery:
+    skip: int
+    limit: int
+    before: tuple[datetime, uuid.UUID] | None
+    after: tuple[datetime, uuid.UUID] | None
+    latest: bool
+
+    @property
+    def newest_first(self) -> bool:
+        return self.latest or self.before is not None
+
+
+def comments_query(
+    skip: int = 0,
+    limit: int = 100,
+    before: str | None = None,
+    after: str | None = None,
+    latest: bool = False,
+) -> CommentsQuery:
+    """
+    Pick a page of a thread, which is always returned oldest first.
+
+    Without a cursor pages go forward from `skip`. `latest` returns the newest
+    `limit` comments, `before` the ones older than a `prev_cursor`, and
+    `after` the ones newer than a `next_cursor`.
+    """
+    if sum((before is not None, after is not None, latest)) > 1:
+        raise HTTPException(
+            status_code=400, detail="Use only one of before, after and latest"
+        )
+    return CommentsQuery(
+        skip=skip,
+        limit=limit,
+        before=decode_cursor(before) if before else None,
+        after=decode_cursor(after) if after else None,
+        latest=latest,
+    )
+
+
+CommentsQueryDep = Annotated[CommentsQuery, Depends(comments_query)]
+
+# Owner, updated_at, last_activity_at, comment_count and a comment, which is
+# None for an incident without comments on the page
+CommentsPageRow = tuple[
+    uuid.UUID, datetime | None, datetime | None, int, Comment | None
+]
+
+
+def comments_page_statement(
+    current_user: UserAuth, incident_id: uuid.UUID, query: CommentsQuery
+) -> Select[uuid.UUID, datetime | None, datetime | None, int, Comment]:
+    """
+    Select an incident's owner and version along with one page of comments.
+
+    The page is a LATERAL subquery that only sees comments the user may read,
+    so a single round-trip answers the access check, the ETag and the page. A
+    forbidden incident still comes back as a row without comments, so it can
+    be told apart from a missing one.
+
+    Cursor pages seek on ix_comment_incident_id_created_at_id instead of
+    scanning past skipped rows. One extra row is fetched to tell whether
+    there is more in the paging direction.
+    """
+    visible = [col(Comment.incident_id) == Incident.id, *_visible_to(current_user)]
+    position = tuple_(col(Comment.created_at), col(Comment.id))
+    page = select(Comment).where(*visible)
+    if query.before:
+        page = page.where(position < query.before)
+    if query.after:
+        page = page.where(position > query.after)
+    if query.newest_first:
+        page = page.order_by(col(Comment.created_at).desc(), col(Comment.id).desc())
+    else:
+        page = page.order_by(col(Comment.created_at).asc(), col(Comment.id).asc())
+    if not (query.before or query.after or query.latest):
+        page = page.offset(query.skip)
+    page_subquery = (
+        page.limit(query.limit + 1).correlate(Incident).subquery().lateral("page")
+    )
+    comment = aliased(Comment, page_subquery)
+    # sqlmodel's select() overloads stop at four columns
+    statement: Select[uuid.UUID, datetime | None, datetime | None, int, Comment]
+    statement = select(  # type: ignore[call-overload]
+        Incident.owner_id,
+        Incident.updated_at,
+        Incident.last_activity_at,
+        Incident.comment_count,
+        comment,
+    )
+    return (
+        statement.select_from(Incident)
+        .outerjoin(page_subquery, true())
+        .where(col(Incident.id) == incident_id)
+        .order_by(page_subquery.c.created_at, page_subquery.c.id)
+    )
+
+
+def read_comments_page(
+    current_user: UserAuth, rows: Sequence[CommentsPageRow], query: CommentsQuery
+) -> tuple[CommentsPublic, IncidentVersion]:
+    """
+    Apply the 404/403 checks to `comments_page_statement` rows and build the
+    page with its cursors, along with the incident version for the ETag.
+
+    The count is the incident's trigger-maintained comment_count, which is
+    exact and already selected, so no count strategy could save any work.
+    """
+    if not rows:
         raise HTTPException(status_code=404, detail="Incident not found")
-    if not current_user.is_superuser and (incident.owner_id != current_user.id):
+    owner_id, updated_at, last_activity_at, comment_count, _ = rows[0]
+    if not current_user.is_superuser and (owner_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return incident
+    comments = [row[4] for row in rows if row[4] is not None]
+    has_more = len(comments) > query.limit
+    if has_more:
+        # The extra row is the furthest one in the paging direction
+        comments = comments[1:] if query.newest_first else comments[:-1]
+    if query.newest_first:
+        has_older, has_newer = has_more, query.before is not None
+    else:
+        has_older = query.after is not None or query.skip > 0
+        has_newer = has_more
+    prev_cursor = next_cursor = None
+    if comments and has_older:
+        prev_cursor = encode_cursor(comments[0].created_at, comments[0].id)
+    if comments and has_newer:
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+    page = CommentsPublic(
+        data=comments,  # type: ignore[arg-type]  # validated into CommentPublic
+        count=comment_count,
+        count_strategy=CountStrategy.EXACT,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+    return page, (updated_at, last_activity_at, comment_count)
+
+
+def create_comment_statement(
+    current_user: UserAuth, comment: Comment
+) -> ReturningInsert[tuple[uuid.UUID]]:
+    """
+    Insert `comment` only if its incident exists and the user may comment on it.
+
+    Returns the comment id, or no row when the insert was refused.
+    """
+    values = [
+        literal(getattr(comment, name), Comment.__table__.c[name].type)  # type: ignore[attr-defined]
+        for name in _COMMENT_COLUMNS
+    ]
+    # sqlmodel's select() has no overload for a variable number of columns
+    allowed = select(*values, Incident.id).where(  # type: ignore[call-overload]
+        col(Incident.id) == comment.incident_id, *_visible_to(current_user)
+    )
+    return (
+        insert(Comment)
+        .from_select([*_COMMENT_COLUMNS, "incident_id"], allowed)
+        .returning(col(Comment.id))
+    )
 
 
 @router.get("/", response_model=CommentsPublic)
 def read_comments(
-    session: SessionDep,
-    current_user: CurrentUser,
+    session: ReadSessionDep,
+    current_user: CurrentAuthUser,
     incident_id: uuid.UUID,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    query: CommentsQueryDep,
+    if_none_match: IfNoneMatch = None,
 ) -> Any:
-    _get_incident_or_404(session, current_user, incident_id)
-    count_statement = (
-        select(func.count())
-        .select_from(Comment)
-        .where(Comment.incident_id == incident_id)
-    )
-    count = session.exec(count_statement).one()
-    statement = (
-        select(Comment)
-        .where(Comment.incident_id == incident_id)
-        .order_by(col(Comment.created_at).asc())
-        .offset(skip)
-        .limit(limit)
-    )
-    comments = session.exec(statement).all()
-    return CommentsPublic(data=comments, count=count)
+    if if_none_match:
+        # Answered from ix_incident_id_version, before any comment is read
+        version = get_incident_version(session, current_user, incident_id)
+        etag = weak_etag(*version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    statement = comments_page_statement(current_user, incident_id, query)
+    rows = session.exec(statement).all()
+    page, version = read_comments_page(current_user, rows, query)
+    response.headers["ETag"] = weak_etag(*version)
+    return page
 
 
 @router.post("/", response_model=CommentPublic)
 def create_comment(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentAuthUser,
     incident_id: uuid.UUID,
     comment_in: CommentCreate,
 ) -> Any:
-    _get_incident_or_404(session, current_user, incident_id)
     comment = Comment.model_validate(
         comment_in,
         update={"author_id": current_user.id, "incident_id": incident_id},
     )
-    session.add(comment)
+    created = session.scalars(create_comment_statement(current_user, comment)).first()
+    if created is None:
+        # Raises the 404 or 403 that refused the insert
+        get_incident_version(session, current_user, incident_id)
+        # The incident only became visible after the insert was refused
+        raise HTTPException(status_code=404, detail="Incident not found")
     session.commit()
-    session.refresh(comment)
     return comment
 
 
 @router.delete("/{comment_id}")
 def delete_comment(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentAuthUser,
     incident_id: uuid.UUID,
     comment_id: uuid.UUID,
 ) -> Message:
-    _get_incident_or_404(session, current_user, incident_id)
-    comment = session.get(Comment, comment_id)
-    if not comment or comment.incident_id != incident_id:
-        raise HTTPException(status_code=404, detail="Comment not found")
-    if not current_user.is_superuser and (comment.author_id != current_user.id):
+    statement = (
+        delete(Comment)
+        .where(
+            col(Comment.id) == comment_id,
+            col(Comment.incident_id) == incident_id,
+            col(Comment.incident_id) == Incident.id,
+            *_visible_to(current_user),
+        )
+        .returning(col(Comment.id))
+    )
+    if not current_user.is_superuser:
+        statement = statement.where(col(Comment.author_id) == current_user.id)
+    deleted = session.scalars(
+        statement, execution_options={"synchronize_session": False}
+    ).first()
+    if deleted is None:
+        # Nothing was deleted, so work out which check failed
+        get_incident_version(session, current_user, incident_id)
+        comment = session.get(Comment, comment_id)
+        if not comment or comment.incident_id != incident_id:
+            raise HTTPException(status_code=404, detail="Comment not found")
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    session.delete(comment)
     session.commit()
     return Message(message="Comment deleted successfully")
@@ -1,72 +1,874 @@
+import asyncio
+import csv
+import io
+import time
 import uuid
-from datetime import datetime, timezone
-from typing import Any
+from collections.abc import AsyncIterator, Iterator, Sequence
+from datetime import date, datetime, timedelta, timezone
+from typing import Annotated, Any, NamedTuple
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import col, func, select
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    ARRAY,
+    Boolean,
+    ColumnElement,
+    Double,
+    Engine,
+    Uuid,
+    any_,
+    bindparam,
+    case,
+    cast,
+    column,
+    insert,
+    tuple_,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, col, delete, func, select
+from sqlmodel.sql.expression import SelectOfScalar
 
-from app.api.deps import CurrentUser, SessionDep
-from app.models import Incident, IncidentCreate, IncidentPublic, IncidentsPublic, IncidentStatus, IncidentUpdate, Message
+from app.api.counting import count_rows
+from app.api.deps import (
+    CurrentAuthUser,
+    ReadSessionDep,
+    SessionDep,
+    TokenDep,
+    get_current_auth_user,
+)
+from app.api.etag import (
+    IfNoneMatch,
+    etag_matches,
+    get_incident_version,
+    incident_version,
+    not_modified,
+    weak_etag,
+)
+from app.api.pagination import (
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+from app.core.config import settings
+from app.core.db import engine
+from app.core.incident_events import (
+    STREAM_CLOSED,
+    broker,
+    event_position,
+    latest_event_position,
+    load_events,
+)
+from app.core.replicas import get_read_engine
+from app.models import (
+    SEARCH_CONFIG,
+    Comment,
+    CommentPublic,
+    CountStrategy,
+    ExportFormat,
+    Incident,
+    IncidentBacklogPoint,
+    IncidentBulkResult,
+    IncidentCategory,
+    IncidentCreate,
+    IncidentDailyRollup,
+    IncidentDetail,
+    IncidentEvent,
+    IncidentEventPublic,
+    IncidentExpand,
+    IncidentPriority,
+    IncidentPublic,
+    IncidentsBatchGet,
+    IncidentsBatchGetResults,
+    IncidentsBulkCreate,
+    IncidentsBulkDelete,
+    IncidentsBulkResults,
+    IncidentsBulkUpdate,
+    IncidentSearchHit,
+    IncidentSearchResults,
+    IncidentSort,
+    IncidentsPublic,
+    IncidentStats,
+    IncidentStatsRollup,
+    IncidentStatus,
+    IncidentUpdate,
+    Message,
+    UserAuth,
+    comment_search_vector,
+    get_datetime_utc,
+)
 
 router = APIRouter(prefix="/incidents", tags=["incidents"])
 
 
+_SORT_ORDER: dict[IncidentSort, tuple[ColumnElement[Any], ...]] = {
+    IncidentSort.CREATED_AT_DESC: (
+        col(Incident.created_at).desc(),
+        col(Incident.id).desc(),
+    ),
+    IncidentSort.CREATED_AT_ASC: (
+        col(Incident.created_at).asc(),
+        col(Incident.id).asc(),
+    ),
+    IncidentSort.PRIORITY_DESC: (
+        col(Incident.priority).desc(),
+        col(Incident.created_at).desc(),
+        col(Incident.id).desc(),
+    ),
+    IncidentSort.PRIORITY_ASC: (
+        col(Incident.priority).asc(),
+        col(Incident.created_at).asc(),
+        col(Incident.id).asc(),
+    ),
+    IncidentSort.RESOLVED_AT_DESC: (
+        col(Incident.resolved_at).desc().nulls_last(),
+        col(Incident.id).desc(),
+    ),
+    IncidentSort.RESOLVED_AT_ASC: (
+        col(Incident.resolved_at).asc().nulls_last(),
+        col(Incident.id).asc(),
+    ),
+    IncidentSort.LAST_ACTIVITY_AT_DESC: (
+        col(Incident.last_activity_at).desc(),
+        col(Incident.id).desc(),
+    ),
+    IncidentSort.LAST_ACTIVITY_AT_ASC: (
+        col(Incident.last_activity_at).asc(),
+        col(Incident.id).asc(),
+    ),
+}
+
+# Sorts on a non-null column plus id, so a cursor can seek past the last row
+_KEYSET_SORTS = {
+    IncidentSort.CREATED_AT_DESC: "created_at",
+    IncidentSort.CREATED_AT_ASC: "created_at",
+    IncidentSort.LAST_ACTIVITY_AT_DESC: "last_activity_at",
+    IncidentSort.LAST_ACTIVITY_AT_ASC: "last_activity_at",
+}
+
+
+def filter_incidents(
+    current_user: UserAuth,
+    *,
+    status: IncidentStatus | None = None,
+    priority: IncidentPriority | None = None,
+    category: IncidentCategory | None = None,
+    assignee_id: uuid.UUID | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    resolved_after: datetime | None = None,
+    resolved_before: datetime | None = None,
+) -> SelectOfScalar[Incident]:
+    statement = select(Incident)
+    if not current_user.is_superuser:
+        statement = statement.where(Incident.owner_id == current_user.id)
+    if status is not None:
+        statement = statement.where(Incident.status == status)
+    if priority is not None:
+        statement = statement.where(Incident.priority == priority)
+    if category is not None:
+        statement = statement.where(Incident.category == category)
+    if assignee_id is not None:
+        statement = statement.where(Incident.assignee_id == assignee_id)
+    if created_after is not None:
+        statement = statement.where(col(Incident.created_at) >= created_after)
+    if created_before is not None:
+        statement = statement.where(col(Incident.created_at) < created_before)
+    if resolved_after is not None:
+        statement = statement.where(col(Incident.resolved_at) >= resolved_after)
+    if resolved_before is not None:
+        statement = statement.where(col(Incident.resolved_at) < resolved_before)
+    return statement
+
+
+def paginate_incidents(
+    statement: SelectOfScalar[Incident],
+    *,
+    sort: IncidentSort,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> SelectOfScalar[Incident]:
+    if cursor:
+        if sort not in _KEYSET_SORTS:
+            raise HTTPException(
+                status_code=400,
+                detail="Cursor pagination requires sorting by created_at "
+                "or last_activity_at",
+            )
+        last_value, last_id = decode_cursor(cursor)
+        position = tuple_(getattr(Incident, _KEYSET_SORTS[sort]), col(Incident.id))
+        if sort.value.startswith("-"):
+            statement = statement.where(position < (last_value, last_id))
+        else:
+            statement = statement.where(position > (last_value, last_id))
+    else:
+        statement = statement.offset(skip)
+    # One extra row tells `incidents_page` whether there is a next page
+    return statement.order_by(*_SORT_ORDER[sort]).limit(limit + 1)
+
+
+def incidents_page(
+    incidents: Sequence[Incident], *, sort: IncidentSort, limit: int
+) -> tuple[Sequence[Incident], str | None]:
+    """
+    Split the extra row fetched by `paginate_incidents` off a page.
+
+    A cursor is only returned when that row exists, so a walk ends on its
+    last page instead of with a request for an empty one.
+    """
+    if len(incidents) <= limit:
+        return incidents, None
+    incidents = incidents[:limit]
+    if sort not in _KEYSET_SORTS:
+        return incidents, None
+    last = incidents[-1]
+    return incidents, encode_cursor(getattr(last, _KEYSET_SORTS[sort]), last.id)
+
+
 @router.get("/", response_model=IncidentsPublic)
 def read_incidents(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: ReadSessionDep,
+    current_user: CurrentAuthUser,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    status: IncidentStatus | None = None,
+    priority: IncidentPriority | None = None,
+    category: IncidentCategory | None = None,
+    assignee_id: uuid.UUID | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    resolved_after: datetime | None = None,
+    resolved_before: datetime | None = None,
+    sort: IncidentSort = IncidentSort.CREATED_AT_DESC,
 ) -> Any:
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Incident)
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Incident).order_by(col(Incident.created_at).desc()).offset(skip).limit(limit)
+    statement = filter_incidents(
+        current_user,
+        status=status,
+        priority=priority,
+        category=category,
+        assignee_id=assignee_id,
+        created_after=created_after,
+        created_before=created_before,
+        resolved_after=resolved_after,
+        resolved_before=resolved_before,
+    )
+    # Cursor pages leave the total out: the walk got it with its first page,
+    # and recounting the whole filtered set would make every page O(N)
+    count, count_strategy = (
+        (None, CountStrategy.EXACT) if cursor else count_rows(session, statement)
+    )
+    statement = paginate_incidents(
+        statement, sort=sort, cursor=cursor, skip=skip, limit=limit
+    )
+    incidents, next_cursor = incidents_page(
+        session.exec(statement).all(), sort=sort, limit=limit
+    )
+    return IncidentsPublic(
+        data=incidents,
+        count=count,
+        count_strategy=count_strategy,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/stats", response_model=IncidentStats)
+def read_incident_stats(
+    session: ReadSessionDep,
+    current_user: CurrentAuthUser,
+    days: int = Query(default=30, ge=1, le=366),
+) -> Any:
+    # sqlmodel's select() overloads stop at four columns
+    buckets = select(  # type: ignore[call-overload]
+        col(IncidentStatsRollup.status),
+        col(IncidentStatsRollup.priority),
+        col(IncidentStatsRollup.category),
+        func.sum(IncidentStatsRollup.incident_count),
+        func.sum(IncidentStatsRollup.resolved_count),
+        func.sum(IncidentStatsRollup.resolve_seconds),
+    ).group_by(
+        col(IncidentStatsRollup.status),
+        col(IncidentStatsRollup.priority),
+        col(IncidentStatsRollup.category),
+    )
+    daily = (
+        select(
+            col(IncidentDailyRollup.day),
+            func.sum(IncidentDailyRollup.opened),
+            func.sum(IncidentDailyRollup.resolved),
         )
-        incidents = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Incident)
-            .where(Incident.owner_id == current_user.id)
+        .group_by(col(IncidentDailyRollup.day))
+        .order_by(col(IncidentDailyRollup.day))
+    )
+    if not current_user.is_superuser:
+        buckets = buckets.where(IncidentStatsRollup.owner_id == current_user.id)
+        daily = daily.where(IncidentDailyRollup.owner_id == current_user.id)
+
+    by_status = dict.fromkeys(IncidentStatus, 0)
+    by_priority = dict.fromkeys(IncidentPriority, 0)
+    by_category = dict.fromkeys(IncidentCategory, 0)
+    resolved_count = 0
+    resolve_seconds = 0.0
+    for status, priority, category, count, resolved, seconds in session.exec(buckets):
+        by_status[status] += count
+        by_priority[priority] += count
+        by_category[category] += count
+        resolved_count += resolved
+        resolve_seconds += seconds
+
+    today = get_datetime_utc().date()
+    start = today - timedelta(days=days - 1)
+    backlog = 0
+    changes: dict[date, tuple[int, int]] = {}
+    for day, opened, resolved in session.exec(daily):
+        if day < start:
+            backlog += opened - resolved
+        else:
+            changes[day] = (opened, resolved)
+    points = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        opened, resolved = changes.get(day, (0, 0))
+        backlog += opened - resolved
+        points.append(
+            IncidentBacklogPoint(
+                day=day, opened=opened, resolved=resolved, backlog=backlog
+            )
         )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Incident)
-            .where(Incident.owner_id == current_user.id)
-            .order_by(col(Incident.created_at).desc())
-            .offset(skip)
-            .limit(limit)
+
+    return IncidentStats(
+        total=sum(by_status.values()),
+        by_status=by_status,
+        by_priority=by_priority,
+        by_category=by_category,
+        mean_time_to_resolve_seconds=(
+            resolve_seconds / resolved_count if resolved_count else None
+        ),
+        backlog=points,
+    )
+
+
+@router.get("/search", response_model=IncidentSearchResults)
+def search_incidents(
+    session: ReadSessionDep,
+    current_user: CurrentAuthUser,
+    q: str = Query(min_length=1, max_length=255),
+    include_comments: bool = False,
+    limit: int = 100,
+    cursor: str | None = None,
+) -> Any:
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    matches: Any = select(
+        col(Incident.id).label("incident_id"),
+        func.ts_rank(col(Incident.search_vector), query).label("rank"),
+    ).where(col(Incident.search_vector).op("@@")(query))
+    if include_comments:
+        matches = union_all(
+            matches,
+            select(
+                col(Comment.incident_id),
+                func.ts_rank(comment_search_vector, query),
+            ).where(comment_search_vector.op("@@")(query)),
         )
-        incidents = session.exec(statement).all()
+    matches = matches.subquery()
+    # ts_rank returns a real, but cursors carry the rank as a Python float,
+    # which binds as float8. Compare in float8 so a rank survives the round
+    # trip exactly and ties on the boundary row aren't skipped.
+    ranked = (
+        select(
+            matches.c.incident_id,
+            cast(func.max(matches.c.rank), Double).label("rank"),
+        )
+        .group_by(matches.c.incident_id)
+        .subquery()
+    )
+    statement = select(Incident, ranked.c.rank).join(
+        ranked, ranked.c.incident_id == Incident.id
+    )
+    if not current_user.is_superuser:
+        statement = statement.where(Incident.owner_id == current_user.id)
+    if cursor:
+        rank, last_id = decode_rank_cursor(cursor)
+        statement = statement.where(
+            tuple_(ranked.c.rank, col(Incident.id)) < (rank, last_id)
+        )
+    statement = statement.order_by(ranked.c.rank.desc(), col(Incident.id).desc())
+    rows = session.exec(statement.limit(limit)).all()
 
-    return IncidentsPublic(data=incidents, count=count)
+    hits = [
+        IncidentSearchHit.model_validate(incident, update={"rank": rank})
+        for incident, rank in rows
+    ]
+    next_cursor = None
+    if hits and len(hits) == limit:
+        next_cursor = encode_rank_cursor(hits[-1].rank, hits[-1].id)
+    return IncidentSearchResults(data=hits, next_cursor=next_cursor)
 
 
-@router.get("/{id}", response_model=IncidentPublic)
-def read_incident(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
-    incident = session.get(Incident, id)
+_EXPORT_BATCH_SIZE = 1000
+
+
+def _export_incidents(
+    bind: Engine, owner_id: uuid.UUID | None, format: ExportFormat
+) -> Iterator[str]:
+    statement = select(Incident).order_by(
+        col(Incident.created_at).desc(), col(Incident.id).desc()
+    )
+    if owner_id is not None:
+        statement = statement.where(Incident.owner_id == owner_id)
+    fields = list(IncidentPublic.model_fields)
+    if format == ExportFormat.CSV:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        yield buffer.getvalue()
+    # The request session is closed once the endpoint returns, so the stream
+    # holds its own connection with a server-side cursor for its lifetime.
+    with Session(bind) as session:
+        results = session.exec(
+            statement.execution_options(yield_per=_EXPORT_BATCH_SIZE)
+        )
+        for partition in results.partitions():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fields)
+            for incident in partition:
+                row = IncidentPublic.model_validate(incident)
+                if format == ExportFormat.CSV:
+                    writer.writerow(row.model_dump(mode="json"))
+                else:
+                    buffer.write(row.model_dump_json() + "\n")
+            yield buffer.getvalue()
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_incidents(
+    current_user: CurrentAuthUser, format: ExportFormat = ExportFormat.NDJSON
+) -> StreamingResponse:
+    owner_id = None if current_user.is_superuser else current_user.id
+    media_type = "text/csv" if format == ExportFormat.CSV else "application/x-ndjson"
+    return StreamingResponse(
+        _export_incidents(get_read_engine(), owner_id, format),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="incidents.{format.value}"'
+        },
+    )
+
+
+def _format_event(event: IncidentEvent) -> str:
+    public = IncidentEventPublic.model_validate(event)
+    data = public.model_dump_json()
+    return f"id: {public.id}\nevent: {public.kind.value}\ndata: {data}\n\n"
+
+
+def _reset_event(event_id: int | None) -> str:
+    # An empty id clears the client's Last-Event-ID
+    return f"id: {'' if event_id is None else event_id}\nevent: reset\ndata: {{}}\n\n"
+
+
+class _Reset(NamedTuple):
+    event_id: int | None
+
+
+def _load_replay(
+    last_event_id: int, user: UserAuth, limit: int
+) -> list[IncidentEvent] | _Reset:
+    position = event_position(last_event_id)
+    if position is None:
+        # Already pruned, reset to the latest event
+        latest = latest_event_position()
+        return _Reset(latest[1] if latest else None)
+    events = load_events(position, user=user, limit=limit + 1)
+    if len(events) > limit:
+        return _Reset(events[-1].id)
+    return events
+
+
+def _reauthenticate(token: str) -> UserAuth | None:
+    try:
+        with Session(engine) as session:
+            return get_current_auth_user(session, token)
+    except HTTPException:
+        return None
+
+
+async def _stream_incident_events(
+    token: str, current_user: UserAuth, last_event_id: int | None
+) -> AsyncIterator[str]:
+    async with broker.subscribe() as queue:
+        replayed: set[int | None] = set()
+        if last_event_id is not None:
+            replay = await to_thread.run_sync(
+                _load_replay,
+                last_event_id,
+                current_user,
+                settings.INCIDENT_STREAM_REPLAY_LIMIT,
+            )
+            if isinstance(replay, _Reset):
+                # Too far behind to replay, the client has to reload its view
+                yield _reset_event(replay.event_id)
+            else:
+                for past in replay:
+                    replayed.add(past.id)
+                    yield _format_event(past)
+        auth_checked_at = time.monotonic()
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=settings.INCIDENT_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection
+                yield ": keepalive\n\n"
+                event = None
+            else:
+                if event is STREAM_CLOSED:
+                    return
+            if (
+                time.monotonic() - auth_checked_at
+                >= settings.INCIDENT_STREAM_AUTH_CHECK_SECONDS
+            ):
+                # The token may have expired or the user been deactivated or
+                # demoted since the stream was opened
+                reauthenticated = await to_thread.run_sync(_reauthenticate, token)
+                if reauthenticated is None:
+                    return
+                current_user = reauthenticated
+                auth_checked_at = time.monotonic()
+            if event is None or event.id in replayed:
+                continue
+            if current_user.is_superuser or event.owner_id == current_user.id:
+                yield _format_event(event)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+def stream_incidents(
+    token: TokenDep,
+    current_user: CurrentAuthUser,
+    last_event_id: Annotated[int | None, Header()] = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_incident_events(token, current_user, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+EXPAND_COMMENTS_LIMIT = 100
+
+
+def incident_expand(expand: str | None = None) -> frozenset[IncidentExpand]:
+    """
+    Parse `?expand=comments,owner,assignee,authors`.
+
+    Authors are shown on each comment, so expanding them expands comments too.
+    """
+    if not expand:
+        return frozenset()
+    try:
+        expanded = {IncidentExpand(value.strip()) for value in expand.split(",")}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid expand value")
+    if IncidentExpand.AUTHORS in expanded:
+        expanded.add(IncidentExpand.COMMENTS)
+    return frozenset(expanded)
+
+
+IncidentExpandDep = Annotated[frozenset[IncidentExpand], Depends(incident_expand)]
+
+
+def first_comments_page(
+    session: Session, incident_id: uuid.UUID, *, authors: bool
+) -> tuple[list[dict[str, Any]], str | None]:
+    statement = (
+        select(Comment)
+        .where(Comment.incident_id == incident_id)
+        .order_by(col(Comment.created_at).asc(), col(Comment.id).asc())
+        .limit(EXPAND_COMMENTS_LIMIT + 1)
+    )
+    if authors:
+        statement = statement.options(selectinload(Comment.author))  # type: ignore[arg-type]
+    comments = session.exec(statement).all()
+    next_cursor = None
+    if len(comments) > EXPAND_COMMENTS_LIMIT:
+        comments = comments[:EXPAND_COMMENTS_LIMIT]
+        next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+    page = []
+    for comment in comments:
+        fields = CommentPublic.model_validate(comment).model_dump()
+        if authors:
+            fields["author"] = comment.author
+        page.append(fields)
+    return page, next_cursor
+
+
+def incident_expand_options(expand: frozenset[IncidentExpand]) -> list[Any]:
+    """Loader options for the expanded users, one extra query each."""
+    options = []
+    if IncidentExpand.OWNER in expand:
+        options.append(selectinload(Incident.owner))  # type: ignore[arg-type]
+    if IncidentExpand.ASSIGNEE in expand:
+        options.append(selectinload(Incident.assignee))  # type: ignore[arg-type]
+    return options
+
+
+def incident_detail(
+    session: Session, incident: Incident, expand: frozenset[IncidentExpand]
+) -> IncidentDetail:
+    """
+    Build an incident's response with the `expand`ed fields, the users loaded
+    by `incident_expand_options` and the first page of comments.
+    """
+    # Unexpanded fields are left unset so they are omitted from the response
+    fields = IncidentPublic.model_validate(incident).model_dump()
+    if IncidentExpand.OWNER in expand:
+        fields["owner"] = incident.owner
+    if IncidentExpand.ASSIGNEE in expand:
+        fields["assignee"] = incident.assignee
+    if IncidentExpand.COMMENTS in expand:
+        fields["comments"], fields["comments_next_cursor"] = first_comments_page(
+            session, incident.id, authors=IncidentExpand.AUTHORS in expand
+        )
+    return IncidentDetail.model_validate(fields)
+
+
+@router.get("/{id}", response_model=IncidentDetail, response_model_exclude_unset=True)
+def read_incident(
+    session: ReadSessionDep,
+    current_user: CurrentAuthUser,
+    id: uuid.UUID,
+    response: Response,
+    expand: IncidentExpandDep,
+    if_none_match: IfNoneMatch = None,
+) -> Any:
+    """
+    Read an incident, optionally with its owner, assignee and first page of
+    comments (and their authors) via `expand`.
+
+    Related rows are loaded with one extra query each, however long the
+    thread. The ETag covers the incident and its comments but not renames of
+    the expanded users.
+    """
+    variant = sorted(option.value for option in expand)
+    if if_none_match:
+        etag = weak_etag(*get_incident_version(session, current_user, id), *variant)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+    incident = session.get(Incident, id, options=incident_expand_options(expand))
     if not incident:
         raise HTTPException(status_code=404, detail="Incident not found")
     if not current_user.is_superuser and (incident.owner_id != current_user.id):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return incident
+    response.headers["ETag"] = weak_etag(*incident_version(incident), *variant)
+    return incident_detail(session, incident, expand)
 
 
 @router.post("/", response_model=IncidentPublic)
 def create_incident(
-    *, session: SessionDep, current_user: CurrentUser, incident_in: IncidentCreate
+    *, session: SessionDep, current_user: CurrentAuthUser, incident_in: IncidentCreate
 ) -> Any:
-    incident = Incident.model_validate(incident_in, update={"owner_id": current_user.id})
+    incident = Incident.model_validate(
+        incident_in, update={"owner_id": current_user.id}
+    )
     session.add(incident)
     session.commit()
     session.refresh(incident)
     return incident
 
 
+_BULK_UPDATE_FIELDS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "category",
+    "assignee_id",
+    "resolved_at",
+)
+
+
+def _check_bulk_access(
+    session: SessionDep, current_user: CurrentAuthUser, ids: list[uuid.UUID]
+) -> tuple[list[uuid.UUID], dict[uuid.UUID, IncidentBulkResult]]:
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=400, detail="Duplicate incident ids")
+    owners = dict(
+        session.exec(
+            select(Incident.id, Incident.owner_id).where(col(Incident.id).in_(ids))
+        ).all()
+    )
+    allowed = []
+    rejected = {}
+    for id in ids:
+        if id not in owners:
+            rejected[id] = IncidentBulkResult(
+                id=id, status_code=404, detail="Incident not found"
+            )
+        elif not current_user.is_superuser and owners[id] != current_user.id:
+            rejected[id] = IncidentBulkResult(
+                id=id, status_code=403, detail="Not enough permissions"
+            )
+        else:
+            allowed.append(id)
+    return allowed, rejected
+
+
+def _bulk_result(
+    results: dict[uuid.UUID, IncidentBulkResult], id: uuid.UUID
+) -> IncidentBulkResult:
+    # Rows removed between the access check and the write are reported missing
+    return results.get(id) or IncidentBulkResult(
+        id=id, status_code=404, detail="Incident not found"
+    )
+
+
+@router.post("/bulk", response_model=IncidentsBulkResults)
+def create_incidents_bulk(
+    *, session: SessionDep, current_user: CurrentAuthUser, body: IncidentsBulkCreate
+) -> Any:
+    rows = [
+        {**incident_in.model_dump(), "owner_id": current_user.id}
+        for incident_in in body.data
+    ]
+    statement = insert(Incident).returning(Incident, sort_by_parameter_order=True)
+    incidents = session.scalars(statement, rows).all()
+    session.commit()
+    return IncidentsBulkResults(
+        data=[
+            IncidentBulkResult(
+                id=incident.id,
+                status_code=200,
+                data=IncidentPublic.model_validate(incident),
+            )
+            for incident in incidents
+        ]
+    )
+
+
+@router.patch("/bulk", response_model=IncidentsBulkResults)
+def update_incidents_bulk(
+    *, session: SessionDep, current_user: CurrentAuthUser, body: IncidentsBulkUpdate
+) -> Any:
+    ids = [item.id for item in body.data]
+    allowed, results = _check_bulk_access(session, current_user, ids)
+    if allowed:
+        now = datetime.now(timezone.utc)
+        rows = []
+        for item in body.data:
+            if item.id not in allowed:
+                continue
+            update_dict = item.model_dump(exclude_unset=True, exclude={"id"})
+            if "status" in update_dict:
+                update_dict["resolved_at"] = (
+                    now if update_dict["status"] == IncidentStatus.RESOLVED else None
+                )
+            row: list[Any] = [item.id]
+            for field in _BULK_UPDATE_FIELDS:
+                row += [field in update_dict, update_dict.get(field)]
+            rows.append(tuple(row))
+
+        table_columns = Incident.__table__.c  # type: ignore[attr-defined]
+        value_columns = [column("id", Uuid)]
+        for field in _BULK_UPDATE_FIELDS:
+            value_columns += [
+                column(f"set_{field}", Boolean),
+                column(field, table_columns[field].type),
+            ]
+        changes = values(*value_columns, name="changes").data(rows)
+        assignments = {
+            field: case(
+                (
+                    changes.c[f"set_{field}"],
+                    cast(changes.c[field], table_columns[field].type),
+                ),
+                else_=table_columns[field],
+            )
+            for field in _BULK_UPDATE_FIELDS
+        }
+        statement = (
+            update(Incident)
+            .where(col(Incident.id) == changes.c.id)
+            .values(assignments)
+            .returning(Incident)
+        )
+        if not current_user.is_superuser:
+            statement = statement.where(col(Incident.owner_id) == current_user.id)
+        incidents = session.scalars(
+            statement, execution_options={"synchronize_session": False}
+        ).all()
+        session.commit()
+        for incident in incidents:
+            results[incident.id] = IncidentBulkResult(
+                id=incident.id,
+                status_code=200,
+                data=IncidentPublic.model_validate(incident),
+            )
+    return IncidentsBulkResults(data=[_bulk_result(results, id) for id in ids])
+
+
+@router.delete("/bulk", response_model=IncidentsBulkResults)
+def delete_incidents_bulk(
+    *, session: SessionDep, current_user: CurrentAuthUser, body: IncidentsBulkDelete
+) -> Any:
+    allowed, results = _check_bulk_access(session, current_user, body.ids)
+    if allowed:
+        statement = (
+            delete(Incident)
+            .where(col(Incident.id).in_(allowed))
+            .returning(col(Incident.id))
+        )
+        if not current_user.is_superuser:
+            statement = statement.where(col(Incident.owner_id) == current_user.id)
+        deleted = session.scalars(
+            statement, execution_options={"synchronize_session": False}
+        ).all()
+        session.commit()
+        for id in deleted:
+            results[id] = IncidentBulkResult(
+                id=id, status_code=200, detail="Incident deleted successfully"
+            )
+    return IncidentsBulkResults(data=[_bulk_result(results, id) for id in body.ids])
+
+
+@router.post("/batch-get", response_model=IncidentsBatchGetResults)
+def batch_get_incidents(
+    session: ReadSessionDep, current_user: CurrentAuthUser, body: IncidentsBatchGet
+) -> Any:
+    """
+    Read many incidents by id in one query.
+
+    Forbidden incidents are still fetched so they can be told apart from
+    missing ones, but only their ids are returned.
+    """
+    ids = list(dict.fromkeys(body.ids))
+    # A single array parameter keeps the statement text the same for any
+    # number of ids, unlike an expanded IN list
+    statement = select(Incident).where(
+        col(Incident.id) == any_(bindparam("ids", ids, type_=ARRAY(Uuid)))
+    )
+    incidents = {incident.id: incident for incident in session.exec(statement)}
+    results = IncidentsBatchGetResults(found={}, forbidden=[], missing=[])
+    for id in ids:
+        incident = incidents.get(id)
+        if incident is None:
+            results.missing.append(id)
+        elif not current_user.is_superuser and incident.owner_id != current_user.id:
+            results.forbidden.append(id)
+        else:
+            results.found[id] = IncidentPublic.model_validate(incident)
+    return results
+
+
 @router.put("/{id}", response_model=IncidentPublic)
 def update_incident(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentAuthUser,
     id: uuid.UUID,
     incident_in: IncidentUpdate,
 ) -> Any:
@@ -90,7 +892,7 @@ def update_incident(
 
 @router.delete("/{id}")
 def delete_incident(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentAuthUser, id: uuid.UUID
 ) -> Message:
     incident = session.get(Incident, id)
     if not incident:
@@ -11,9 +11,9 @@ from app.core import security
 from app.core.config import settings
 from app.models import Message, NewPassword, Token, UserPublic, UserUpdate
 from app.utils import (
+    enqueue_email,
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
     verify_password_reset_token,
 )
 
@@ -53,11 +53,13 @@ def recover_password(email: str, session: SessionDep) -> Message:
         email_data = generate_reset_password_email(
             email_to=user.email, email=email, token=password_reset_token
         )
-        send_email(
+        enqueue_email(
+            session=session,
             email_to=user.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
         )
+        session.commit()
     return Message(
         message="If that email is registered, we sent a password recovery link"
     )
@@ -2,16 +2,20 @@ import uuid
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import col, delete, func, select
+from sqlmodel import col, delete, select
 
 from app import crud
+from app.api.counting import count_rows
 from app.api.deps import (
+    CurrentAuthUser,
     CurrentUser,
+    ReadSessionDep,
     SessionDep,
     get_current_active_superuser,
 )
 from app.core.config import settings
 from app.core.security import get_password_hash, verify_password
+from app.core.user_cache import invalidate_user
 from app.models import (
     Incident,
     Message,
@@ -24,7 +28,7 @@ from app.models import (
     UserUpdate,
     UserUpdateMe,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import enqueue_email, generate_new_account_email
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -34,16 +38,15 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+def read_users(session: ReadSessionDep, skip: int = 0, limit: int = 100) -> Any:
+    count, count_strategy = count_rows(session, select(User))
 
     statement = (
         select(User).order_by(col(User.created_at).desc()).offset(skip).limit(limit)
     )
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    return UsersPublic(data=users, count=count, count_strategy=count_strategy)
 
 
 @router.post(
@@ -57,16 +60,18 @@ def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
+        # Queued before crud.create_user commits, so it is saved with the user
+        enqueue_email(
+            session=session,
             email_to=user_in.email,
             subject=email_data.subject,
             html_content=email_data.html_content,
         )
+    user = crud.create_user(session=session, user_create=user_in)
     return user
 
 
@@ -85,6 +90,7 @@ def update_user_me(
     session.add(current_user)
     session.commit()
     session.refresh(current_user)
+    invalidate_user(current_user.id)
     return current_user
 
 
@@ -103,12 +109,16 @@ def update_password_me(
     current_user.hashed_password = hashed_password
     session.add(current_user)
     session.commit()
+    invalidate_user(current_user.id)
     return Message(message="Password updated successfully")
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
-    return current_user
+def read_user_me(session: ReadSessionDep, current_user: CurrentAuthUser) -> Any:
+    user = session.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 
 @router.delete("/me", response_model=Message)
@@ -119,6 +129,7 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
         )
     session.delete(current_user)
     session.commit()
+    invalidate_user(current_user.id)
     return Message(message="User deleted successfully")
 
 
@@ -182,12 +193,12 @@ def update_user(
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep, current_user: CurrentAuthUser, user_id: uuid.UUID
 ) -> Message:
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if user == current_user:
+    if user.id == current_user.id:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
@@ -195,4 +206,5 @@ def delete_user(
     session.exec(statement)
     session.delete(user)
     session.commit()
+    invalidate_user(user_id)
     return Message(message="User deleted successfully")
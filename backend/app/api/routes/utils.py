@@ -1,9 +1,21 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
+from sqlmodel import col, func, select
 
-from app.api.deps import get_current_active_superuser
-from app.models import Message
-from app.utils import generate_test_email, send_email
+from app.api.deps import SessionDep, get_current_active_superuser
+from app.core.config import settings
+from app.core.db import pool_stats
+from app.models import (
+    DatabasePoolStats,
+    EmailOutbox,
+    EmailOutboxStats,
+    EmailStatus,
+    Message,
+    get_datetime_utc,
+)
+from app.utils import enqueue_email, generate_test_email
 
 router = APIRouter(prefix="/utils", tags=["utils"])
 
@@ -13,16 +25,62 @@ router = APIRouter(prefix="/utils", tags=["utils"])
     dependencies=[Depends(get_current_active_superuser)],
     status_code=201,
 )
-def test_email(email_to: EmailStr) -> Message:
+def test_email(session: SessionDep, email_to: EmailStr) -> Message:
     email_data = generate_test_email(email_to=email_to)
-    send_email(
+    enqueue_email(
+        session=session,
         email_to=email_to,
         subject=email_data.subject,
         html_content=email_data.html_content,
     )
+    session.commit()
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/email-outbox/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_email_outbox_stats(session: SessionDep) -> EmailOutboxStats:
+    counts: dict[Any, int] = dict(
+        session.exec(
+            select(EmailOutbox.status, func.count()).group_by(col(EmailOutbox.status))
+        ).all()
+    )
+    oldest_pending = session.exec(
+        select(func.min(EmailOutbox.created_at)).where(
+            EmailOutbox.status == EmailStatus.PENDING
+        )
+    ).one()
+    return EmailOutboxStats(
+        pending=counts.get(EmailStatus.PENDING, 0),
+        sending=counts.get(EmailStatus.SENDING, 0),
+        sent=counts.get(EmailStatus.SENT, 0),
+        failed=counts.get(EmailStatus.FAILED, 0),
+        oldest_pending_seconds=(
+            (get_datetime_utc() - oldest_pending).total_seconds()
+            if oldest_pending
+            else None
+        ),
+    )
+
+
+@router.get(
+    "/db-pool/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_db_pool_stats() -> DatabasePoolStats:
+    return DatabasePoolStats(
+        pool_size=0 if settings.DB_PGBOUNCER else settings.DB_POOL_SIZE,
+        max_overflow=0 if settings.DB_PGBOUNCER else settings.DB_MAX_OVERFLOW,
+        checked_out=pool_stats.checked_out,
+        checkouts=pool_stats.checkouts,
+        timeouts=pool_stats.timeouts,
+        wait_seconds_total=pool_stats.wait_seconds_total,
+        wait_seconds_max=pool_stats.wait_seconds_max,
+    )
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -0,0 +1,46 @@
+import uuid
+
+from anyio import to_thread
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.security import verify_password
+from app.crud import DUMMY_HASH
+from app.models import Incident, IncidentCreate, User
+
+
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    session_user = (await session.exec(statement)).first()
+    return session_user
+
+
+async def authenticate(
+    *, session: AsyncSession, email: str, password: str
+) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
+    # Hashing blocks on the password hashing pool, so keep it off the event loop
+    if not db_user:
+        await to_thread.run_sync(verify_password, password, DUMMY_HASH)
+        return None
+    verified, updated_password_hash = await to_thread.run_sync(
+        verify_password, password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if updated_password_hash:
+        db_user.hashed_password = updated_password_hash
+        session.add(db_user)
+        await session.commit()
+        await session.refresh(db_user)
+    return db_user
+
+
+async def create_incident(
+    *, session: AsyncSession, incident_in: IncidentCreate, owner_id: uuid.UUID
+) -> Incident:
+    db_incident = Incident.model_validate(incident_in, update={"owner_id": owner_id})
+    session.add(db_incident)
+    await session.commit()
+    await session.refresh(db_incident)
+    return db_incident
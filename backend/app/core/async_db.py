@@ -0,0 +1,33 @@
+from collections.abc import Callable
+from typing import Concatenate, ParamSpec, TypeVar
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import engine_options, track_pool
+from app.core.metrics import track_queries
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI), **engine_options(async_=True)
+)
+track_pool(async_engine.sync_engine)
+track_queries(async_engine.sync_engine)
+
+
+async def run_sync(
+    session: AsyncSession,
+    fn: Callable[Concatenate[Session, P], T],
+    *args: P.args,
+    **kwargs: P.kwargs,
+) -> T:
+    """
+    Run a sync helper that takes a sqlmodel `Session` on the async session.
+    """
+    # The sync session behind sqlmodel's AsyncSession is a sqlmodel Session,
+    # AsyncSession.run_sync is only typed for the plain SQLAlchemy one
+    return await session.run_sync(fn, *args, **kwargs)  # type: ignore[arg-type]
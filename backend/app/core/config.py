@@ -1,3 +1,4 @@
+import importlib.util
 import secrets
 import warnings
 from typing import Annotated, Any, Literal
@@ -48,6 +49,12 @@ class Settings(BaseSettings):
 
     PROJECT_NAME: str
     SENTRY_DSN: HttpUrl | None = None
+    METRICS_ENABLED: bool = True
+    # Bearer token Prometheus must send to scrape /metrics; unset or empty, 404
+    METRICS_TOKEN: str | None = None
+    SERVER_TIMING_ENABLED: bool = True
+    # Log a possible N+1 when one statement runs this often in a request
+    QUERY_REPEAT_THRESHOLD: int = 5
     POSTGRES_SERVER: str
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str
@@ -66,6 +73,72 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    POSTGRES_REPLICA_URLS: Annotated[
+        list[PostgresDsn] | str, BeforeValidator(parse_cors)
+    ] = []
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = 10
+    REPLICA_READ_YOUR_WRITES_SECONDS: int = 5
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PGBOUNCER: bool = False
+
+    # Threads for sync routes and dependencies, anyio's default is 40
+    THREADPOOL_SIZE: int = 40
+
+    PASSWORD_HASH_WORKERS: int = 2
+    # The workers plus a short queue: each pending call holds a threadpool
+    # thread until its hash is done
+    PASSWORD_HASH_MAX_PENDING: int = 4
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    @model_validator(mode="after")
+    def _check_password_hash_pending(self) -> Self:
+        # A login burst must not be able to take the threads the other sync
+        # routes run on
+        if self.PASSWORD_HASH_MAX_PENDING > self.THREADPOOL_SIZE // 4:
+            raise ValueError(
+                "PASSWORD_HASH_MAX_PENDING must be at most a quarter of THREADPOOL_SIZE"
+            )
+        return self
+
+    USER_CACHE_BACKEND: Literal["memory", "redis", "disabled"] = "memory"
+    USER_CACHE_REDIS_URL: str | None = None
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    @model_validator(mode="after")
+    def _check_user_cache_backend(self) -> Self:
+        if self.USER_CACHE_BACKEND != "redis":
+            return self
+        if not self.USER_CACHE_REDIS_URL:
+            raise ValueError("USER_CACHE_BACKEND=redis requires USER_CACHE_REDIS_URL")
+        if importlib.util.find_spec("redis") is None:
+            raise ValueError(
+                "USER_CACHE_BACKEND=redis requires the redis package, "
+                'install it with the "redis" extra'
+            )
+        return self
+
+    LIST_COUNT_STRATEGY: Literal["exact", "estimate", "capped", "cached"] = "exact"
+    LIST_COUNT_CAP: int = 10000
+    LIST_COUNT_CACHE_TTL_SECONDS: int = 30
+
+    ASYNC_DB: bool = False
+
+    INCIDENT_STREAM_QUEUE_SIZE: int = 1000
+    INCIDENT_STREAM_REPLAY_LIMIT: int = 1000
+    INCIDENT_STREAM_HEARTBEAT_SECONDS: int = 15
+    INCIDENT_STREAM_POLL_SECONDS: float = 1.0
+    INCIDENT_STREAM_AUTH_CHECK_SECONDS: int = 60
+    INCIDENT_EVENTS_RETENTION_HOURS: int = 24
+    INCIDENT_EVENTS_PRUNE_INTERVAL_SECONDS: int = 3600
+
+    INCIDENT_STATS_COMPACT_INTERVAL_SECONDS: int = 300
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -74,6 +147,17 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str | None = None
     EMAILS_FROM_EMAIL: EmailStr | None = None
     EMAILS_FROM_NAME: str | None = None
+    SMTP_TIMEOUT_SECONDS: int = 30
+
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_POLL_SECONDS: float = 2.0
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 8
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: int = 30
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: int = 3600
+    EMAIL_OUTBOX_RETENTION_HOURS: int = 168
+    # How long a worker may hold a claimed batch before others reclaim it
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 600
+    EMAIL_WORKER_METRICS_PORT: int = 9101
 
     @model_validator(mode="after")
     def _set_default_emails_from(self) -> Self:
@@ -82,6 +166,10 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Re-check template files for changes on every render, for local editing
+    EMAIL_TEMPLATES_AUTO_RELOAD: bool = False
+    # Directory for compiled template bytecode, defaults to a per-user temp dir
+    EMAIL_TEMPLATES_CACHE_DIR: str | None = None
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -1,11 +1,108 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, Pool, event, exc
+from sqlalchemy.pool import (
+    AsyncAdaptedQueuePool,
+    ConnectionPoolEntry,
+    NullPool,
+    QueuePool,
+)
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_TIMEOUTS,
+    DB_POOL_WAIT,
+    track_queries,
+)
 from app.models import User, UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
 
+@dataclass
+class PoolStats:
+    checked_out: int = 0
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+
+pool_stats = PoolStats()
+_pool_stats_lock = threading.Lock()
+
+
+def _record_checkout_wait(seconds: float, *, timed_out: bool) -> None:
+    with _pool_stats_lock:
+        pool_stats.wait_seconds_total += seconds
+        pool_stats.wait_seconds_max = max(pool_stats.wait_seconds_max, seconds)
+        if timed_out:
+            pool_stats.timeouts += 1
+    DB_POOL_WAIT.observe(seconds)
+    if timed_out:
+        DB_POOL_TIMEOUTS.inc()
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            _record_checkout_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        _record_checkout_wait(time.perf_counter() - start, timed_out=False)
+        return connection
+
+
+class TimedAsyncAdaptedQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(*, async_: bool = False) -> dict[str, Any]:
+    if settings.DB_PGBOUNCER:
+        # PgBouncer in transaction mode does the pooling and may hand each
+        # transaction a different backend, so server-side prepared statements
+        # can't be relied on.
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if async_ else TimedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def track_pool(target: Engine | Pool) -> None:
+    @event.listens_for(target, "checkout")
+    def _on_checkout(*_: Any) -> None:
+        with _pool_stats_lock:
+            pool_stats.checked_out += 1
+            pool_stats.checkouts += 1
+        DB_POOL_CHECKED_OUT.inc()
+        DB_POOL_CHECKOUTS.inc()
+
+    @event.listens_for(target, "checkin")
+    def _on_checkin(*_: Any) -> None:
+        with _pool_stats_lock:
+            pool_stats.checked_out -= 1
+        DB_POOL_CHECKED_OUT.dec()
+
+
+engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI), **engine_options())
+track_pool(engine)
+track_queries(engine)
 
 
 def init_db(session: Session) -> None:
@@ -0,0 +1,226 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import psycopg
+from anyio import to_thread
+from sqlalchemy import BigInteger, literal_column, make_url, tuple_
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import IncidentEvent, UserAuth, get_datetime_utc
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "incident_events"
+
+# Put on a subscriber's queue when it is closed by the broker
+STREAM_CLOSED = None
+
+EventQueue = asyncio.Queue[IncidentEvent | None]
+
+
+# Position of an event in the feed, (xid, id)
+EventPosition = tuple[int, int]
+
+# Oldest transaction still running when the statement's snapshot was taken.
+# Events written by older transactions are all committed or rolled back.
+_HORIZON = literal_column(
+    "pg_snapshot_xmin(pg_current_snapshot())::text::bigint", BigInteger
+)
+
+
+def _position_of(event: IncidentEvent | None) -> EventPosition | None:
+    return None if event is None or event.id is None else (event.xid, event.id)
+
+
+def event_position(event_id: int) -> EventPosition | None:
+    with Session(engine) as session:
+        xid = session.exec(
+            select(IncidentEvent.xid).where(IncidentEvent.id == event_id)
+        ).first()
+    return None if xid is None else (xid, event_id)
+
+
+def latest_event_position() -> EventPosition | None:
+    statement = (
+        select(IncidentEvent)
+        .where(col(IncidentEvent.xid) < _HORIZON)
+        .order_by(col(IncidentEvent.xid).desc(), col(IncidentEvent.id).desc())
+        .limit(1)
+    )
+    with Session(engine) as session:
+        return _position_of(session.exec(statement).first())
+
+
+def load_events(
+    after: EventPosition,
+    *,
+    user: UserAuth | None = None,
+    limit: int | None = None,
+) -> list[IncidentEvent]:
+    """
+    Load the events after `after` that no running transaction can precede.
+
+    Ids are drawn at insert time, so a lower id can commit after a higher
+    one. Events are ordered by writing transaction instead, and stop at the
+    oldest transaction still in progress: everything it or any later
+    transaction writes sorts after what is returned, so resuming from the
+    last returned position never skips an event.
+    """
+    position = tuple_(col(IncidentEvent.xid), col(IncidentEvent.id))
+    statement = (
+        select(IncidentEvent)
+        .where(
+            position > tuple_(*after, types=[BigInteger, BigInteger]),
+            col(IncidentEvent.xid) < _HORIZON,
+        )
+        .order_by(col(IncidentEvent.xid), col(IncidentEvent.id))
+        .limit(limit)
+    )
+    if user is not None and not user.is_superuser:
+        statement = statement.where(IncidentEvent.owner_id == user.id)
+    with Session(engine) as session:
+        return list(session.exec(statement).all())
+
+
+def prune_events() -> None:
+    cutoff = get_datetime_utc() - timedelta(
+        hours=settings.INCIDENT_EVENTS_RETENTION_HOURS
+    )
+    with Session(engine) as session:
+        session.exec(
+            delete(IncidentEvent).where(col(IncidentEvent.created_at) < cutoff)
+        )
+        session.commit()
+
+
+class IncidentEventBroker:
+    """
+    Fans out incident events from one LISTEN connection to every subscriber
+    in this worker process.
+
+    Notifications only wake the broker up: events are read back with
+    `load_events` so they are published in resumable order. Events held back
+    behind a running transaction are picked up by polling every
+    `poll_interval` seconds.
+
+    The connection is opened with the first subscriber and closed after the
+    last one leaves. A subscriber whose queue fills up is closed rather than
+    allowed to hold up the others; it can resume from its last event id.
+    """
+
+    reconnect_delay = 1.0
+
+    def __init__(
+        self, *, queue_size: int, prune_interval: float, poll_interval: float
+    ) -> None:
+        self.queue_size = queue_size
+        self.prune_interval = prune_interval
+        self.poll_interval = poll_interval
+        self._subscribers: set[EventQueue] = set()
+        self._task: asyncio.Task[None] | None = None
+        self._listening = asyncio.Event()
+        self._position: EventPosition | None = None
+        self._last_prune = 0.0
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[EventQueue]:
+        queue: EventQueue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._listening = asyncio.Event()
+            self._task = asyncio.create_task(self._listen())
+        try:
+            # Callers replay history after subscribing, so LISTEN must be in
+            # place first or events committed in between would be lost
+            await self._listening.wait()
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers and self._task is not None:
+                self._task.cancel()
+                self._task = None
+
+    def publish(self, event: IncidentEvent) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._close(queue)
+
+    def _close(self, queue: EventQueue) -> None:
+        self._subscribers.discard(queue)
+        # Drop everything it hasn't read so its last seen event id is a safe
+        # resume point
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(STREAM_CLOSED)
+
+    async def _catch_up(self) -> None:
+        if self._position is None:
+            self._position = await to_thread.run_sync(latest_event_position) or (0, 0)
+            return
+        for event in await to_thread.run_sync(load_events, self._position):
+            self.publish(event)
+            self._position = _position_of(event) or self._position
+
+    async def _prune_if_due(self) -> None:
+        if time.monotonic() - self._last_prune >= self.prune_interval:
+            self._last_prune = time.monotonic()
+            await to_thread.run_sync(prune_events)
+
+    async def _listen(self) -> None:
+        conninfo = (
+            make_url(str(settings.SQLALCHEMY_DATABASE_URI))
+            .set(drivername="postgresql")
+            .render_as_string(hide_password=False)
+        )
+        try:
+            while True:
+                try:
+                    async with await psycopg.AsyncConnection.connect(
+                        conninfo, autocommit=True
+                    ) as connection:
+                        await connection.execute(f"LISTEN {CHANNEL}")
+                        # Also picks up events committed while disconnected
+                        await self._catch_up()
+                        self._listening.set()
+                        while True:
+                            await self._prune_if_due()
+                            async for _ in connection.notifies(
+                                timeout=self.poll_interval, stop_after=1
+                            ):
+                                pass
+                            await self._catch_up()
+                # Catch-up and pruning go through SQLAlchemy, which wraps
+                # the driver's errors in its own
+                except (psycopg.OperationalError, DBAPIError):
+                    self._listening.clear()
+                    logger.warning(
+                        "Incident event listener disconnected, reconnecting",
+                        exc_info=True,
+                    )
+                    await asyncio.sleep(self.reconnect_delay)
+        finally:
+            # Whatever ended the listener, end the streams relying on it and
+            # release subscribers still waiting for LISTEN, so none of them
+            # waits forever. They can resume from their last event id. A
+            # listener cancelled by its last subscriber leaving has already
+            # been replaced and must not touch the next one's subscribers.
+            if self._task is asyncio.current_task():
+                for queue in list(self._subscribers):
+                    self._close(queue)
+                self._listening.set()
+
+
+broker = IncidentEventBroker(
+    queue_size=settings.INCIDENT_STREAM_QUEUE_SIZE,
+    prune_interval=settings.INCIDENT_EVENTS_PRUNE_INTERVAL_SECONDS,
+    poll_interval=settings.INCIDENT_STREAM_POLL_SECONDS,
+)
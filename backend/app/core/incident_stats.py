@@ -0,0 +1,32 @@
+import asyncio
+import logging
+
+from anyio import to_thread
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+
+logger = logging.getLogger(__name__)
+
+
+def compact_incident_stats() -> None:
+    with Session(engine) as session:
+        crud.compact_incident_stats(session=session)
+
+
+async def compact_incident_stats_periodically() -> None:
+    """
+    Fold the stats rollups every `INCIDENT_STATS_COMPACT_INTERVAL_SECONDS`.
+
+    Every worker process runs this; a compaction that finds another one
+    already running skips its turn.
+    """
+    while True:
+        await asyncio.sleep(settings.INCIDENT_STATS_COMPACT_INTERVAL_SECONDS)
+        try:
+            await to_thread.run_sync(compact_incident_stats)
+        except DBAPIError:
+            logger.warning("Compacting incident stats failed", exc_info=True)
@@ -0,0 +1,250 @@
+import collections
+import logging
+import os
+import secrets
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi.routing import APIRoute
+from fastapi.security.utils import get_authorization_scheme_param
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# With PROMETHEUS_MULTIPROC_DIR set, prometheus_client keeps every metric in
+# files under that directory so /metrics can add up all worker processes.
+# Gauges then need a multiprocess_mode saying how to combine them.
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while serving a request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_REPEATED_STATEMENTS = Counter(
+    "db_repeated_statements_total",
+    "Requests that ran one statement QUERY_REPEAT_THRESHOLD times or more",
+    ["route"],
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total", "Database connections checked out of the pool"
+)
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total", "Pool checkouts that gave up waiting for a connection"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hashing calls running or queued for the worker pool",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time to hash or verify a password, including the wait for a worker",
+    ["outcome"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hashing calls turned away because the pool queue was full",
+)
+EMAIL_DELIVERIES = Counter(
+    "email_deliveries_total",
+    "Outbox emails handed to the SMTP relay, by outcome",
+    ["outcome"],
+)
+EMAIL_SMTP_CONNECTS = Counter(
+    "email_smtp_connects_total",
+    "SMTP connections opened by the email worker",
+)
+
+
+@dataclass
+class RequestQueries:
+    count: int = 0
+    seconds: float = 0.0
+    # Statements keep their bind placeholders, so the text is the query shape
+    statements: collections.Counter[str] = field(default_factory=collections.Counter)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [
+            (statement, times)
+            for statement, times in self.statements.items()
+            if times >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+# Set by MetricsMiddleware. Sync routes and dependencies run in a copy of the
+# request's context, so they share this object and their queries are counted.
+request_queries: ContextVar[RequestQueries | None] = ContextVar(
+    "request_queries", default=None
+)
+
+
+def track_queries(target: Engine) -> None:
+    @event.listens_for(target, "before_cursor_execute")
+    def _before_cursor_execute(conn: Any, *_: Any) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(target, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn: Any,
+        cursor: Any,  # noqa: ARG001
+        statement: str,
+        *_: Any,
+    ) -> None:
+        seconds = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_DURATION.observe(seconds)
+        queries = request_queries.get()
+        if queries is not None:
+            queries.count += 1
+            queries.seconds += seconds
+            queries.statements[statement] += 1
+
+
+class MetricsMiddleware:
+    """
+    Record request count, latency, in-flight requests and queries per request.
+
+    Also reports the request's database time in a Server-Timing header and
+    logs statements repeated often enough to suggest an N+1 query pattern.
+
+    A plain ASGI middleware rather than BaseHTTPMiddleware, so it adds no extra
+    task per request and doesn't buffer streaming responses.
+    """
+
+    def __init__(self, app: ASGIApp, *, route_name: Callable[[APIRoute], str]) -> None:
+        self.app = app
+        self.route_name = route_name
+
+    def _route_label(self, scope: Scope) -> str:
+        # The router stores the matched route in the scope while handling
+        route = scope.get("route")
+        if isinstance(route, APIRoute):
+            return self.route_name(route)
+        if route is not None:
+            return str(getattr(route, "name", "unknown"))
+        return "unmatched"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        queries = RequestQueries()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    # Streaming responses only report queries run before the
+                    # first chunk
+                    MutableHeaders(scope=message).append(
+                        "Server-Timing", queries.server_timing()
+                    )
+            await send(message)
+
+        token = request_queries.set(queries)
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            request_queries.reset(token)
+            route = self._route_label(scope)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route).observe(duration)
+            DB_QUERIES_PER_REQUEST.labels(route).observe(queries.count)
+            repeated = queries.repeated(settings.QUERY_REPEAT_THRESHOLD)
+            if repeated:
+                DB_REPEATED_STATEMENTS.labels(route).inc()
+            for statement, times in repeated:
+                logger.warning(
+                    "Possible N+1 in %s: statement ran %d times: %s",
+                    route,
+                    times,
+                    statement,
+                )
+
+
+def collector_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        # prometheus_client leaves the collector constructor unannotated
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return registry
+    return REGISTRY
+
+
+def metrics(request: Request) -> Response:
+    # Served from the public app, so only to scrapers holding METRICS_TOKEN
+    if not settings.METRICS_TOKEN:
+        return Response(status_code=404)
+    scheme, token = get_authorization_scheme_param(request.headers.get("Authorization"))
+    if scheme.lower() != "bearer" or not secrets.compare_digest(
+        token.encode(), settings.METRICS_TOKEN.encode()
+    ):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(
+        generate_latest(collector_registry()), media_type=CONTENT_TYPE_LATEST
+    )
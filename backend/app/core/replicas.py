@@ -0,0 +1,172 @@
+import threading
+import time
+from collections.abc import Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import Engine, ExceptionContext, event, exc, text
+from sqlalchemy.orm import ORMExecuteState
+from sqlmodel import Session, create_engine
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.db import engine, engine_options, track_pool
+from app.core.metrics import track_queries
+
+
+class ReplicaPool:
+    """
+    Picks a read replica engine, round-robin, for read-only request handlers.
+
+    A replica that fails with a connection error is taken out of rotation and
+    probed with `SELECT 1` once `health_check_interval` seconds have passed.
+    """
+
+    def __init__(
+        self, engines: Sequence[Engine], *, health_check_interval: float
+    ) -> None:
+        self.engines = list(engines)
+        self.health_check_interval = health_check_interval
+        self._next = 0
+        self._down_until: dict[Engine, float] = {}
+        self._lock = threading.Lock()
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._on_error)
+
+    def _on_error(self, context: ExceptionContext) -> None:
+        if context.engine is not None and (
+            context.is_disconnect or context.connection is None
+        ):
+            self.mark_down(context.engine)
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.health_check_interval
+
+    def _is_healthy(self, replica: Engine) -> bool:
+        with self._lock:
+            down_until = self._down_until.get(replica)
+            if down_until is None:
+                return True
+            if down_until > time.monotonic():
+                return False
+            # Keep other requests off the replica while this one probes it
+            self._down_until[replica] = time.monotonic() + self.health_check_interval
+        try:
+            with replica.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except exc.DBAPIError:
+            return False
+        with self._lock:
+            self._down_until.pop(replica, None)
+        return True
+
+    def choose(self) -> Engine | None:
+        if not self.engines:
+            return None
+        for _ in self.engines:
+            with self._lock:
+                replica = self.engines[self._next % len(self.engines)]
+                self._next += 1
+            if self._is_healthy(replica):
+                return replica
+        return None
+
+
+def _create_replica(url: str) -> Engine:
+    replica = create_engine(url, **engine_options())
+    track_pool(replica)
+    track_queries(replica)
+    return replica
+
+
+replica_pool = ReplicaPool(
+    [_create_replica(str(url)) for url in settings.POSTGRES_REPLICA_URLS],
+    health_check_interval=settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS,
+)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+
+@dataclass
+class RequestWrites:
+    read_primary: bool
+    wrote: bool = False
+
+
+# Set by ReadYourWritesMiddleware. Sync routes and dependencies run in a copy
+# of the request's context, so they share this object and can flag writes.
+request_writes: ContextVar[RequestWrites | None] = ContextVar(
+    "request_writes", default=None
+)
+
+
+def _read_primary(deadline: str | None) -> bool:
+    try:
+        return deadline is not None and float(deadline) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Keep a client reading from the primary for `sticky_seconds` after a write.
+
+    The deadline travels in a cookie instead of process memory, so it holds
+    whichever worker process or replica of the API serves the next request.
+    """
+
+    def __init__(self, app: ASGIApp, *, sticky_seconds: int) -> None:
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookies = HTTPConnection(scope).cookies
+        writes = RequestWrites(
+            read_primary=_read_primary(cookies.get(READ_PRIMARY_COOKIE))
+        )
+
+        async def send_with_cookie(message: Message) -> None:
+            # Writes made after a streaming response started are not covered
+            if message["type"] == "http.response.start" and writes.wrote:
+                deadline = time.time() + self.sticky_seconds
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{READ_PRIMARY_COOKIE}={deadline:.3f}; Max-Age={self.sticky_seconds}; "
+                    "Path=/; HttpOnly; SameSite=lax",
+                )
+            await send(message)
+
+        token = request_writes.set(writes)
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            request_writes.reset(token)
+
+
+def get_read_engine() -> Engine:
+    writes = request_writes.get()
+    if writes is not None and (writes.read_primary or writes.wrote):
+        return engine
+    return replica_pool.choose() or engine
+
+
+@event.listens_for(Session, "after_flush")
+def _record_write(*_: Any) -> None:
+    writes = request_writes.get()
+    if writes is not None:
+        writes.wrote = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement_write(orm_execute_state: ORMExecuteState) -> None:
+    # INSERT/UPDATE/DELETE statements run through the session skip the flush
+    if not orm_execute_state.is_select:
+        _record_write()
@@ -1,5 +1,11 @@
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, TypeVar
 
 import jwt
 from pwdlib import PasswordHash
@@ -7,6 +13,11 @@ from pwdlib.hashers.argon2 import Argon2Hasher
 from pwdlib.hashers.bcrypt import BcryptHasher
 
 from app.core.config import settings
+from app.core.metrics import (
+    PASSWORD_HASH_DURATION,
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_REJECTED,
+)
 
 password_hash = PasswordHash(
     (
@@ -18,6 +29,102 @@ password_hash = PasswordHash(
 
 ALGORITHM = "HS256"
 
+T = TypeVar("T")
+
+
+class PasswordHashingBusyError(Exception):
+    pass
+
+
+@dataclass
+class PasswordHashingStats:
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class PasswordHashingPool:
+    """
+    Runs password hashing in a dedicated pool of worker processes.
+
+    At most `max_pending` calls may be running or queued at once; further
+    calls fail fast with `PasswordHashingBusyError` instead of piling up.
+    With `workers=0` the hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.stats = PasswordHashingStats()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats.rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHashingBusyError()
+        with self._lock:
+            self.stats.in_flight += 1
+        PASSWORD_HASH_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        failed = True
+        try:
+            if self.workers:
+                result = self._get_executor().submit(fn, *args).result()
+            else:
+                result = fn(*args)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            self._slots.release()
+            PASSWORD_HASH_IN_FLIGHT.dec()
+            PASSWORD_HASH_DURATION.labels("error" if failed else "ok").observe(elapsed)
+            with self._lock:
+                self.stats.in_flight -= 1
+                if failed:
+                    self.stats.failed += 1
+                else:
+                    self.stats.completed += 1
+                self.stats.total_seconds += elapsed
+                self.stats.max_seconds = max(self.stats.max_seconds, elapsed)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+password_hashing_pool = PasswordHashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return password_hash.verify_and_update(plain_password, hashed_password)
+
+
+def _hash(password: str) -> str:
+    return password_hash.hash(password)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
@@ -29,8 +136,10 @@ def create_access_token(subject: str | Any, expires_delta: timedelta) -> str:
 def verify_password(
     plain_password: str, hashed_password: str
 ) -> tuple[bool, str | None]:
-    return password_hash.verify_and_update(plain_password, hashed_password)
+    return password_hashing_pool.run(
+        _verify_and_update, plain_password, hashed_password
+    )
 
 
 def get_password_hash(password: str) -> str:
-    return password_hash.hash(password)
+    return password_hashing_pool.run(_hash, password)
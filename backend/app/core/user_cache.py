@@ -0,0 +1,129 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Protocol
+
+from app.core.config import settings
+from app.models import UserAuth
+
+
+class UserCacheBackend(Protocol):
+    def get(self, user_id: uuid.UUID) -> UserAuth | None: ...
+
+    def set(self, user: UserAuth) -> None: ...
+
+    def delete(self, user_id: uuid.UUID) -> None: ...
+
+
+class KeyValueClient(Protocol):
+    """The subset of the redis-py client API used by `SharedUserCache`."""
+
+    def get(self, name: str) -> Any: ...
+
+    def set(self, name: str, value: str, ex: int | None = None) -> Any: ...
+
+    def delete(self, *names: str) -> Any: ...
+
+
+class DisabledUserCache:
+    def get(self, user_id: uuid.UUID) -> UserAuth | None:
+        return None
+
+    def set(self, user: UserAuth) -> None:
+        pass
+
+    def delete(self, user_id: uuid.UUID) -> None:
+        pass
+
+
+class MemoryUserCache:
+    """Per-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, *, ttl: int, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[float, UserAuth]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: uuid.UUID) -> UserAuth | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def set(self, user: UserAuth) -> None:
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+class SharedUserCache:
+    """Cache stored in a key-value service shared by every worker process."""
+
+    key_prefix = "user-auth:"
+
+    def __init__(self, client: KeyValueClient, *, ttl: int) -> None:
+        self.client = client
+        self.ttl = ttl
+
+    def get(self, user_id: uuid.UUID) -> UserAuth | None:
+        value = self.client.get(f"{self.key_prefix}{user_id}")
+        if value is None:
+            return None
+        return UserAuth.model_validate_json(value)
+
+    def set(self, user: UserAuth) -> None:
+        self.client.set(
+            f"{self.key_prefix}{user.id}", user.model_dump_json(), ex=self.ttl
+        )
+
+    def delete(self, user_id: uuid.UUID) -> None:
+        self.client.delete(f"{self.key_prefix}{user_id}")
+
+
+def _create_backend() -> UserCacheBackend:
+    if settings.USER_CACHE_BACKEND == "disabled":
+        return DisabledUserCache()
+    if settings.USER_CACHE_BACKEND == "redis":
+        assert settings.USER_CACHE_REDIS_URL, "USER_CACHE_REDIS_URL is not set"
+        # Optional dependency, settings validation checks it is installed
+        import redis
+
+        client = redis.Redis.from_url(settings.USER_CACHE_REDIS_URL)
+        return SharedUserCache(client, ttl=settings.USER_CACHE_TTL_SECONDS)
+    return MemoryUserCache(
+        ttl=settings.USER_CACHE_TTL_SECONDS,
+        max_entries=settings.USER_CACHE_MAX_ENTRIES,
+    )
+
+
+_backend: UserCacheBackend | None = None
+
+
+def get_user_cache() -> UserCacheBackend:
+    global _backend
+    if _backend is None:
+        _backend = _create_backend()
+    return _backend
+
+
+def set_user_cache(backend: UserCacheBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    get_user_cache().delete(user_id)
@@ -1,10 +1,33 @@
 import uuid
+from collections.abc import Sequence
 from typing import Any
 
-from sqlmodel import Session, select
+from sqlalchemy import (
+    Date,
+    and_,
+    cast,
+    insert,
+    literal,
+    text,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlmodel import Session, col, delete, func, select
 
 from app.core.security import get_password_hash, verify_password
-from app.models import Incident, IncidentCreate, User, UserCreate, UserUpdate
+from app.core.user_cache import invalidate_user
+from app.models import (
+    Comment,
+    Incident,
+    IncidentCreate,
+    IncidentDailyRollup,
+    IncidentStatsRollup,
+    User,
+    UserCreate,
+    UserUpdate,
+)
 
 
 def create_user(*, session: Session, user_create: UserCreate) -> User:
@@ -28,6 +51,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    invalidate_user(db_user.id)
     return db_user
 
 
@@ -62,3 +86,228 @@ def create_incident(*, session: Session, incident_in: IncidentCreate, owner_id:
     session.commit()
     session.refresh(db_incident)
     return db_incident
+
+
+# Serializes rebuilding and compacting the rollups, which both replace rows
+_INCIDENT_STATS_LOCK = func.hashtext("incident_stats")
+
+_STATS_ROLLUP_COLUMNS = [
+    "owner_id",
+    "status",
+    "priority",
+    "category",
+    "incident_count",
+    "resolved_count",
+    "resolve_seconds",
+]
+_DAILY_ROLLUP_COLUMNS = ["owner_id", "day", "opened", "resolved"]
+
+
+def rebuild_incident_stats(*, session: Session, batch_size: int = 1000) -> None:
+    """
+    Recompute the stats rollups from the incidents, a batch of owners at a time.
+
+    Each batch replaces its owners' rows in a single statement, so it works
+    from one snapshot: the deltas of incident writes it can see are replaced
+    along with the rest, later ones are kept. Incident writes are never
+    blocked.
+    """
+    last_id = None
+    while True:
+        ids_statement = select(User.id).order_by(col(User.id)).limit(batch_size)
+        if last_id is not None:
+            ids_statement = ids_statement.where(col(User.id) > last_id)
+        owner_ids = session.exec(ids_statement).all()
+        if not owner_ids:
+            return
+        last_id = owner_ids[-1]
+        session.exec(select(func.pg_advisory_xact_lock(_INCIDENT_STATS_LOCK)))
+        session.execute(_rebuild_incident_stats_statement(owner_ids))
+        session.commit()
+
+
+def _rebuild_incident_stats_statement(owner_ids: Sequence[uuid.UUID]) -> Any:
+    owned = col(Incident.owner_id).in_(owner_ids)
+    resolved = and_(
+        col(Incident.resolved_at).is_not(None), col(Incident.created_at).is_not(None)
+    )
+    resolve_seconds = func.extract(
+        "epoch", col(Incident.resolved_at) - col(Incident.created_at)
+    )
+    # sqlmodel's select() overloads stop at four columns
+    buckets = select(  # type: ignore[call-overload]
+        col(Incident.owner_id),
+        col(Incident.status),
+        col(Incident.priority),
+        col(Incident.category),
+        func.count(),
+        func.count().filter(resolved),
+        func.coalesce(func.sum(resolve_seconds), 0),
+    ).where(owned).group_by(
+        col(Incident.owner_id),
+        col(Incident.status),
+        col(Incident.priority),
+        col(Incident.category),
+    )
+    changes = union_all(
+        select(
+            col(Incident.owner_id),
+            cast(func.timezone("UTC", col(Incident.created_at)), Date).label("day"),
+            literal(1).label("opened"),
+            literal(0).label("resolved"),
+        ).where(owned, col(Incident.created_at).is_not(None)),
+        select(
+            col(Incident.owner_id),
+            cast(func.timezone("UTC", col(Incident.resolved_at)), Date),
+            literal(0),
+            literal(1),
+        ).where(owned, col(Incident.resolved_at).is_not(None)),
+    ).subquery()
+    daily = select(
+        changes.c.owner_id,
+        changes.c.day,
+        func.sum(changes.c.opened),
+        func.sum(changes.c.resolved),
+    ).group_by(changes.c.owner_id, changes.c.day)
+
+    # Data-modifying CTEs all see the statement's snapshot, not each other
+    cleared_stats = (
+        delete(IncidentStatsRollup)
+        .where(col(IncidentStatsRollup.owner_id).in_(owner_ids))
+        .returning(col(IncidentStatsRollup.id))
+        .cte("cleared_stats")
+    )
+    cleared_daily = (
+        delete(IncidentDailyRollup)
+        .where(col(IncidentDailyRollup.owner_id).in_(owner_ids))
+        .returning(col(IncidentDailyRollup.id))
+        .cte("cleared_daily")
+    )
+    rebuilt_stats = (
+        insert(IncidentStatsRollup)
+        .from_select(_STATS_ROLLUP_COLUMNS, buckets)
+        .returning(col(IncidentStatsRollup.id))
+        .cte("rebuilt_stats")
+    )
+    return (
+        insert(IncidentDailyRollup)
+        .from_select(_DAILY_ROLLUP_COLUMNS, daily)
+        .add_cte(cleared_stats, cleared_daily, rebuilt_stats)
+    )
+
+
+def compact_incident_stats(*, session: Session) -> bool:
+    """
+    Fold the rollup rows appended by incident writes into one row per key.
+
+    Rows of deltas that cancel out are dropped. Returns False without doing
+    anything when a rebuild or another compaction is running.
+    """
+    locked = session.exec(
+        select(func.pg_try_advisory_xact_lock(_INCIDENT_STATS_LOCK))
+    ).one()
+    if not locked:
+        return False
+
+    stats = delete(IncidentStatsRollup).returning(
+        *(col(getattr(IncidentStatsRollup, name)) for name in _STATS_ROLLUP_COLUMNS)
+    ).cte("stats")
+    stats_key = [stats.c.owner_id, stats.c.status, stats.c.priority, stats.c.category]
+    # sqlmodel's select() overloads stop at four columns
+    folded_stats = select(  # type: ignore[call-overload]
+        *stats_key,
+        func.sum(stats.c.incident_count),
+        func.sum(stats.c.resolved_count),
+        func.sum(stats.c.resolve_seconds),
+    ).group_by(*stats_key).having(func.sum(stats.c.incident_count) != 0)
+    session.execute(
+        insert(IncidentStatsRollup).from_select(_STATS_ROLLUP_COLUMNS, folded_stats)
+    )
+
+    daily = delete(IncidentDailyRollup).returning(
+        *(col(getattr(IncidentDailyRollup, name)) for name in _DAILY_ROLLUP_COLUMNS)
+    ).cte("daily")
+    folded_daily = select(
+        daily.c.owner_id,
+        daily.c.day,
+        func.sum(daily.c.opened),
+        func.sum(daily.c.resolved),
+    ).group_by(daily.c.owner_id, daily.c.day).having(
+        (func.sum(daily.c.opened) != 0) | (func.sum(daily.c.resolved) != 0)
+    )
+    session.execute(
+        insert(IncidentDailyRollup).from_select(_DAILY_ROLLUP_COLUMNS, folded_daily)
+    )
+    session.commit()
+    return True
+
+
+def repair_incident_activity(*, session: Session, batch_size: int = 1000) -> int:
+    """
+    Recompute comment_count and last_activity_at for every incident.
+
+    Works through incidents in id order, committing each batch so locks are
+    only held briefly. Returns how many incidents had drifted.
+    """
+    repaired = 0
+    last_id = None
+    while True:
+        ids_statement = select(Incident.id).order_by(col(Incident.id)).limit(batch_size)
+        if last_id is not None:
+            ids_statement = ids_statement.where(col(Incident.id) > last_id)
+        ids = session.exec(ids_statement).all()
+        if not ids:
+            return repaired
+        last_id = ids[-1]
+
+        # Hold off comment writes for the batch, so the counts can't change
+        # between reading and storing them
+        session.execute(text("LOCK TABLE comment IN SHARE MODE"))
+        comments = (
+            select(
+                func.count().label("total"),
+                func.max(Comment.updated_at).label("latest"),
+            )
+            .where(col(Comment.incident_id) == Incident.id)
+            .correlate(Incident)
+            .subquery()
+            .lateral()
+        )
+        correct = (
+            select(
+                col(Incident.id),
+                comments.c.total,
+                func.coalesce(
+                    func.greatest(
+                        col(Incident.created_at),
+                        col(Incident.updated_at),
+                        comments.c.latest,
+                    ),
+                    func.now(),
+                ).label("last_activity_at"),
+            )
+            .join(comments, true())
+            .where(col(Incident.id).in_(ids))
+            .subquery()
+        )
+        result = session.execute(
+            update(Incident)
+            .where(
+                col(Incident.id) == correct.c.id,
+                tuple_(
+                    col(Incident.comment_count), col(Incident.last_activity_at)
+                ).is_distinct_from(tuple_(correct.c.total, correct.c.last_activity_at)),
+            )
+            .values(
+                comment_count=correct.c.total,
+                last_activity_at=correct.c.last_activity_at,
+                # Keeps updated_at from being bumped, so no incident_updated
+                # event is published for the repair
+                updated_at=Incident.updated_at,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        # An ORM-enabled UPDATE returns a CursorResult at runtime, the
+        # Session.execute stubs only promise a Result
+        repaired += result.rowcount  # type: ignore[attr-defined]
+        session.commit()
@@ -0,0 +1,217 @@
+import logging
+import smtplib
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from email.message import EmailMessage
+from email.utils import formataddr
+
+from prometheus_client import start_http_server
+from sqlmodel import Session, col, delete, select
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import EMAIL_DELIVERIES, EMAIL_SMTP_CONNECTS, collector_registry
+from app.models import EmailOutbox, EmailStatus, get_datetime_utc
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_PRUNE_INTERVAL_SECONDS = 3600
+
+
+@dataclass
+class DeliveryStats:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    connects: int = 0
+
+
+class SMTPConnection:
+    """
+    A single SMTP connection reused for every delivery.
+
+    It is opened on first use and reopened when the relay has dropped it,
+    which most relays do to idle connections.
+    """
+
+    def __init__(self, stats: DeliveryStats) -> None:
+        self.stats = stats
+        self._smtp: smtplib.SMTP | None = None
+
+    def _connect(self) -> smtplib.SMTP:
+        assert settings.SMTP_HOST, "SMTP_HOST is not set"
+        smtp: smtplib.SMTP
+        if not settings.SMTP_TLS and settings.SMTP_SSL:
+            smtp = smtplib.SMTP_SSL(
+                settings.SMTP_HOST,
+                settings.SMTP_PORT,
+                timeout=settings.SMTP_TIMEOUT_SECONDS,
+            )
+        else:
+            smtp = smtplib.SMTP(
+                settings.SMTP_HOST,
+                settings.SMTP_PORT,
+                timeout=settings.SMTP_TIMEOUT_SECONDS,
+            )
+            if settings.SMTP_TLS:
+                smtp.starttls()
+        if settings.SMTP_USER and settings.SMTP_PASSWORD:
+            smtp.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        self.stats.connects += 1
+        EMAIL_SMTP_CONNECTS.inc()
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException):
+            # The relay refused this message but the connection is still usable
+            raise
+        except OSError:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+def build_message(email: EmailOutbox) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = email.subject
+    message["From"] = formataddr(
+        (settings.EMAILS_FROM_NAME or "", str(settings.EMAILS_FROM_EMAIL))
+    )
+    message["To"] = email.email_to
+    message.set_content(email.html_content, subtype="html")
+    return message
+
+
+def _is_permanent(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def retry_delay(attempts: int) -> timedelta:
+    seconds = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS))
+
+
+def claim_batch(session: Session) -> list[EmailOutbox]:
+    """
+    Lease a batch of due emails to this worker.
+
+    Claimed emails are marked SENDING with next_attempt_at as the end of the
+    lease, and committed before anything is sent, so no row lock is held
+    during SMTP I/O. SKIP LOCKED lets several workers claim concurrently. If a
+    worker dies mid-batch its lease runs out and the emails are claimed again
+    (at-least-once delivery).
+    """
+    now = get_datetime_utc()
+    statement = (
+        select(EmailOutbox)
+        .where(
+            col(EmailOutbox.status).in_([EmailStatus.PENDING, EmailStatus.SENDING]),
+            col(EmailOutbox.next_attempt_at) <= now,
+        )
+        .order_by(col(EmailOutbox.next_attempt_at))
+        .limit(settings.EMAIL_OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    emails = session.exec(statement).all()
+    lease_until = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+    for email in emails:
+        email.status = EmailStatus.SENDING
+        email.attempts += 1
+        email.next_attempt_at = lease_until
+        session.add(email)
+    session.commit()
+    return list(emails)
+
+
+def deliver_batch(
+    session: Session, connection: SMTPConnection, stats: DeliveryStats
+) -> int:
+    emails = claim_batch(session)
+    for email in emails:
+        if email.next_attempt_at <= get_datetime_utc():
+            # The lease ran out, another worker may have claimed the rest
+            break
+        try:
+            connection.send(build_message(email))
+        except (smtplib.SMTPException, OSError) as error:
+            email.last_error = str(error)
+            if (
+                _is_permanent(error)
+                or email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            ):
+                email.status = EmailStatus.FAILED
+                stats.failed += 1
+                EMAIL_DELIVERIES.labels("failed").inc()
+                logger.warning(f"Giving up on email {email.id}: {error}")
+            else:
+                email.status = EmailStatus.PENDING
+                email.next_attempt_at = get_datetime_utc() + retry_delay(email.attempts)
+                stats.retried += 1
+                EMAIL_DELIVERIES.labels("retried").inc()
+        else:
+            email.status = EmailStatus.SENT
+            email.sent_at = get_datetime_utc()
+            email.last_error = None
+            stats.sent += 1
+            EMAIL_DELIVERIES.labels("sent").inc()
+        session.add(email)
+        # Saved per email, so a crash only resends the one being delivered
+        session.commit()
+    return len(emails)
+
+
+def prune_sent(session: Session) -> None:
+    cutoff = get_datetime_utc() - timedelta(hours=settings.EMAIL_OUTBOX_RETENTION_HOURS)
+    session.exec(delete(EmailOutbox).where(col(EmailOutbox.sent_at) < cutoff))
+    session.commit()
+
+
+def run() -> None:
+    stats = DeliveryStats()
+    connection = SMTPConnection(stats)
+    last_prune = 0.0
+    try:
+        while True:
+            # Claimed emails are used after their claim is committed
+            with Session(engine, expire_on_commit=False) as session:
+                delivered = deliver_batch(session, connection, stats)
+                if time.monotonic() - last_prune >= _PRUNE_INTERVAL_SECONDS:
+                    prune_sent(session)
+                    last_prune = time.monotonic()
+            if delivered:
+                logger.info(f"Email delivery stats: {stats}")
+            else:
+                time.sleep(settings.EMAIL_OUTBOX_POLL_SECONDS)
+    finally:
+        connection.close()
+
+
+def main() -> None:
+    logger.info("Starting email worker")
+    if settings.METRICS_ENABLED:
+        start_http_server(
+            settings.EMAIL_WORKER_METRICS_PORT, registry=collector_registry()
+        )
+    run()
+
+
+if __name__ == "__main__":
+    main()
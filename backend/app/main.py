@@ -1,10 +1,20 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.incident_stats import compact_incident_stats_periodically
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.replicas import ReadYourWritesMiddleware
+from app.core.security import PasswordHashingBusyError, password_hashing_pool
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,12 +24,34 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    compaction = asyncio.create_task(compact_incident_stats_periodically())
+    yield
+    compaction.cancel()
+    # Stop the hashing worker processes with the server, not at interpreter exit
+    password_hashing_pool.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, route_name=custom_generate_unique_id)
+    app.add_route("/metrics", metrics, include_in_schema=False)
+
+if settings.POSTGRES_REPLICA_URLS:
+    app.add_middleware(
+        ReadYourWritesMiddleware,
+        sticky_seconds=settings.REPLICA_READ_YOUR_WRITES_SECONDS,
+    )
+
 if settings.all_cors_origins:
     app.add_middleware(
         CORSMiddleware,
@@ -29,4 +61,17 @@ if settings.all_cors_origins:
         allow_headers=["*"],
     )
 
+
+@app.exception_handler(PasswordHashingBusyError)
+async def password_hashing_busy_handler(
+    request: Request,  # noqa: ARG001
+    exc: PasswordHashingBusyError,  # noqa: ARG001
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
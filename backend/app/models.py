@@ -1,16 +1,31 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 
 from pydantic import EmailStr
-from sqlalchemy import DateTime
-from sqlmodel import Field, Relationship, SQLModel
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Computed,
+    DateTime,
+    FetchedValue,
+    Index,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlmodel import AutoString, Field, Relationship, SQLModel, col, func
 
 
 def get_datetime_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
+BULK_MAX_ITEMS = 500
+
+# Rendered as a literal so the planner can match the expression GIN indexes
+SEARCH_CONFIG = text("'english'::regconfig")
+
+
 
 class IncidentStatus(str, Enum):
     OPEN = "open"
@@ -32,6 +47,36 @@ class IncidentCategory(str, Enum):
     DOCUMENTATION = "documentation"
 
 
+class IncidentSort(str, Enum):
+    CREATED_AT_DESC = "-created_at"
+    CREATED_AT_ASC = "created_at"
+    PRIORITY_DESC = "-priority"
+    PRIORITY_ASC = "priority"
+    RESOLVED_AT_DESC = "-resolved_at"
+    RESOLVED_AT_ASC = "resolved_at"
+    LAST_ACTIVITY_AT_DESC = "-last_activity_at"
+    LAST_ACTIVITY_AT_ASC = "last_activity_at"
+
+
+class IncidentExpand(str, Enum):
+    COMMENTS = "comments"
+    OWNER = "owner"
+    ASSIGNEE = "assignee"
+    AUTHORS = "authors"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class CountStrategy(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    CAPPED = "capped"
+    CACHED = "cached"
+
+
 
 class UserBase(SQLModel):
     email: EmailStr = Field(unique=True, index=True, max_length=255)
@@ -83,14 +128,27 @@ class User(UserBase, table=True):
 
 
 
+class UserAuth(SQLModel):
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+
+
 class UserPublic(UserBase):
     id: uuid.UUID
     created_at: datetime | None = None
 
 
+# Shown to anyone who can read an incident, so no email address
+class UserSummary(SQLModel):
+    id: uuid.UUID
+    full_name: str | None = None
+
+
 class UsersPublic(SQLModel):
     data: list[UserPublic]
     count: int
+    count_strategy: CountStrategy = CountStrategy.EXACT
 
 
 
@@ -123,6 +181,11 @@ class Incident(IncidentBase, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
+    )
     owner_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
@@ -139,9 +202,91 @@ class Incident(IncidentBase, table=True):
     resolved_at: datetime | None = Field(
         default=None, sa_type=DateTime(timezone=True),  # type: ignore
     )
+    # Maintained by triggers: last_activity_at is the latest of created_at,
+    # updated_at and the incident's comments' updated_at. The
+    # repair_incident_activity command recomputes both from scratch.
+    comment_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
+    last_activity_at: datetime | None = Field(
+        default=None,
+        nullable=False,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={
+            "server_default": func.now(),
+            "server_onupdate": FetchedValue(),
+        },
+    )
     comments: list["Comment"] = Relationship(
         back_populates="incident", cascade_delete=True
     )
+    search_vector: str | None = Field(
+        default=None,
+        sa_column=Column(
+            TSVECTOR,
+            Computed(
+                "to_tsvector('english'::regconfig, "
+                "coalesce(title, '') || ' ' || coalesce(description, ''))",
+                persisted=True,
+            ),
+        ),
+    )
+
+
+Index(
+    "ix_incident_owner_id_created_at_id",
+    col(Incident.owner_id),
+    col(Incident.created_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_created_at_id",
+    col(Incident.created_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_owner_id_status_priority_created_at",
+    col(Incident.owner_id),
+    col(Incident.status),
+    col(Incident.priority).desc(),
+    col(Incident.created_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_assignee_id_status_priority_created_at",
+    col(Incident.assignee_id),
+    col(Incident.status),
+    col(Incident.priority).desc(),
+    col(Incident.created_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_status_priority_created_at",
+    col(Incident.status),
+    col(Incident.priority).desc(),
+    col(Incident.created_at).desc(),
+    col(Incident.id).desc(),
+)
+Index("ix_incident_resolved_at", col(Incident.resolved_at))
+Index(
+    "ix_incident_search_vector",
+    col(Incident.search_vector),
+    postgresql_using="gin",
+)
+Index(
+    "ix_incident_owner_id_last_activity_at_id",
+    col(Incident.owner_id),
+    col(Incident.last_activity_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_last_activity_at_id",
+    col(Incident.last_activity_at).desc(),
+    col(Incident.id).desc(),
+)
+Index(
+    "ix_incident_id_version",
+    col(Incident.id),
+    postgresql_include=["owner_id", "updated_at", "last_activity_at", "comment_count"],
+)
 
 
 
@@ -151,11 +296,114 @@ class IncidentPublic(IncidentBase):
     assignee_id: uuid.UUID | None = None
     created_at: datetime | None = None
     resolved_at: datetime | None = None
+    comment_count: int = 0
+    last_activity_at: datetime | None = None
 
 
 class IncidentsPublic(SQLModel):
     data: list[IncidentPublic]
-    count: int
+    # Left out of cursor pages, the first page of a walk has it
+    count: int | None = None
+    count_strategy: CountStrategy = CountStrategy.EXACT
+    next_cursor: str | None = None
+
+
+class IncidentsBulkCreate(SQLModel):
+    data: list[IncidentCreate] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class IncidentBulkUpdateItem(IncidentUpdate):
+    id: uuid.UUID
+
+
+class IncidentsBulkUpdate(SQLModel):
+    data: list[IncidentBulkUpdateItem] = Field(
+        min_length=1, max_length=BULK_MAX_ITEMS
+    )
+
+
+class IncidentsBulkDelete(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class IncidentBulkResult(SQLModel):
+    id: uuid.UUID
+    status_code: int
+    detail: str | None = None
+    data: IncidentPublic | None = None
+
+
+class IncidentsBulkResults(SQLModel):
+    data: list[IncidentBulkResult]
+
+
+class IncidentsBatchGet(SQLModel):
+    ids: list[uuid.UUID] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+
+class IncidentsBatchGetResults(SQLModel):
+    found: dict[uuid.UUID, IncidentPublic]
+    forbidden: list[uuid.UUID]
+    missing: list[uuid.UUID]
+
+
+class IncidentSearchHit(IncidentPublic):
+    rank: float
+
+
+class IncidentSearchResults(SQLModel):
+    data: list[IncidentSearchHit]
+    next_cursor: str | None = None
+
+
+# Rollups behind /incidents/stats, maintained by triggers on incident. The
+# rebuild_incident_stats command recomputes them from scratch.
+# The rollups are append-only, several rows can share a key and are summed
+# when read. See crud.compact_incident_stats.
+class IncidentStatsRollup(SQLModel, table=True):
+    __tablename__ = "incident_stats_rollup"
+
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    owner_id: uuid.UUID = Field(index=True)
+    status: IncidentStatus
+    priority: IncidentPriority
+    category: IncidentCategory
+    incident_count: int = 0
+    resolved_count: int = 0
+    resolve_seconds: float = 0
+
+
+class IncidentDailyRollup(SQLModel, table=True):
+    __tablename__ = "incident_daily_rollup"
+
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    owner_id: uuid.UUID
+    day: date
+    opened: int = 0
+    resolved: int = 0
+
+
+Index(
+    "ix_incident_daily_rollup_owner_id_day",
+    col(IncidentDailyRollup.owner_id),
+    col(IncidentDailyRollup.day),
+)
+
+
+class IncidentBacklogPoint(SQLModel):
+    day: date
+    opened: int
+    resolved: int
+    backlog: int
+
+
+class IncidentStats(SQLModel):
+    total: int
+    by_status: dict[IncidentStatus, int]
+    by_priority: dict[IncidentPriority, int]
+    by_category: dict[IncidentCategory, int]
+    mean_time_to_resolve_seconds: float | None
+    backlog: list[IncidentBacklogPoint]
 
 
 
@@ -173,6 +421,11 @@ class Comment(CommentBase, table=True):
         default_factory=get_datetime_utc,
         sa_type=DateTime(timezone=True),  # type: ignore
     )
+    updated_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": get_datetime_utc},
+    )
     author_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
     )
@@ -183,6 +436,24 @@ class Comment(CommentBase, table=True):
     incident: Incident | None = Relationship(back_populates="comments")
 
 
+Index(
+    "ix_comment_incident_id_created_at_id",
+    col(Comment.incident_id),
+    col(Comment.created_at),
+    col(Comment.id),
+)
+
+Index(
+    "ix_comment_incident_id_updated_at",
+    col(Comment.incident_id),
+    col(Comment.updated_at),
+)
+
+comment_search_vector = func.to_tsvector(SEARCH_CONFIG, col(Comment.content))
+
+Index("ix_comment_search_vector", comment_search_vector, postgresql_using="gin")
+
+
 class CommentPublic(CommentBase):
     id: uuid.UUID
     author_id: uuid.UUID
@@ -193,6 +464,63 @@ class CommentPublic(CommentBase):
 class CommentsPublic(SQLModel):
     data: list[CommentPublic]
     count: int
+    count_strategy: CountStrategy = CountStrategy.EXACT
+    # Pass as `after` to load newer comments, or as `before` for older ones
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class CommentDetail(CommentPublic):
+    author: UserSummary | None = None
+
+
+# read_incident with ?expand=; only the expanded fields are included
+class IncidentDetail(IncidentPublic):
+    owner: UserSummary | None = None
+    assignee: UserSummary | None = None
+    comments: list[CommentDetail] | None = None
+    # Pass as `after` to the comments endpoint for the rest of the thread
+    comments_next_cursor: str | None = None
+
+
+class IncidentEventKind(str, Enum):
+    INCIDENT_CREATED = "incident_created"
+    INCIDENT_UPDATED = "incident_updated"
+    INCIDENT_DELETED = "incident_deleted"
+    COMMENT_CREATED = "comment_created"
+    COMMENT_UPDATED = "comment_updated"
+    COMMENT_DELETED = "comment_deleted"
+
+
+class IncidentEventBase(SQLModel):
+    kind: IncidentEventKind
+    incident_id: uuid.UUID
+    comment_id: uuid.UUID | None = None
+
+
+# Rows are written by database triggers on incident and comment, which also
+# NOTIFY the incident_events channel with the row as JSON
+class IncidentEvent(IncidentEventBase, table=True):
+    __tablename__ = "incident_event"
+
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    kind: IncidentEventKind = Field(sa_type=AutoString(length=32))
+    owner_id: uuid.UUID
+    # Writing transaction, set by the database. Events are read in (xid, id)
+    # order, see load_events.
+    xid: int = Field(default=0, sa_type=BigInteger)
+    created_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+    )
+
+
+Index("ix_incident_event_created_at", col(IncidentEvent.created_at))
+Index("ix_incident_event_xid_id", col(IncidentEvent.xid), col(IncidentEvent.id))
+
+
+class IncidentEventPublic(IncidentEventBase):
+    id: int
 
 
 
@@ -200,6 +528,68 @@ class Message(SQLModel):
     message: str
 
 
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    # Claimed by a worker until next_attempt_at, see app/email_worker.py
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+# Emails are written here by request handlers and delivered by
+# app/email_worker.py
+class EmailOutbox(SQLModel, table=True):
+    __tablename__ = "email_outbox"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    email_to: str = Field(max_length=255)
+    subject: str
+    html_content: str
+    status: EmailStatus = Field(default=EmailStatus.PENDING)
+    attempts: int = 0
+    last_error: str | None = None
+    created_at: datetime | None = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+    )
+    next_attempt_at: datetime = Field(
+        default_factory=get_datetime_utc,
+        sa_type=DateTime(timezone=True),
+    )
+    sent_at: datetime | None = Field(
+        default=None,
+        sa_type=DateTime(timezone=True),
+    )
+
+
+Index(
+    "ix_email_outbox_due_next_attempt_at",
+    col(EmailOutbox.next_attempt_at),
+    postgresql_where=col(EmailOutbox.status).in_(
+        [EmailStatus.PENDING, EmailStatus.SENDING]
+    ),
+)
+Index("ix_email_outbox_sent_at", col(EmailOutbox.sent_at))
+
+
+class EmailOutboxStats(SQLModel):
+    pending: int
+    sending: int
+    sent: int
+    failed: int
+    oldest_pending_seconds: float | None
+
+
+class DatabasePoolStats(SQLModel):
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
 
 class Token(SQLModel):
     access_token: str
@@ -0,0 +1,20 @@
+import logging
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Rebuilding incident stats")
+    with Session(engine) as session:
+        crud.rebuild_incident_stats(session=session)
+    logger.info("Incident stats rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import logging
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Repairing incident comment counts and activity")
+    with Session(engine) as session:
+        repaired = crud.repair_incident_activity(session=session)
+    logger.info("Repaired %d incidents", repaired)
+
+
+if __name__ == "__main__":
+    main()
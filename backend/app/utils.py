@@ -1,16 +1,18 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 from jwt.exceptions import InvalidTokenError
+from sqlmodel import Session
 
 from app.core import security
 from app.core.config import settings
+from app.models import EmailOutbox
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,37 +24,50 @@ class EmailData:
     subject: str
 
 
+EMAIL_TEMPLATES_DIR = Path(__file__).parent / "email-templates" / "build"
+
+
+@lru_cache
+def get_email_environment() -> Environment:
+    """
+    Build the shared Jinja environment and compile every email template.
+
+    Compiled templates stay in the environment's cache, and their bytecode is
+    written to disk so other worker processes skip the compile step too.
+    """
+    environment = Environment(
+        loader=FileSystemLoader(EMAIL_TEMPLATES_DIR),
+        bytecode_cache=FileSystemBytecodeCache(settings.EMAIL_TEMPLATES_CACHE_DIR),
+        auto_reload=settings.EMAIL_TEMPLATES_AUTO_RELOAD,
+    )
+    for template_name in environment.list_templates():
+        environment.get_template(template_name)
+    return environment
+
+
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
+    template = get_email_environment().get_template(template_name)
+    html_content = template.render(context)
     return html_content
 
 
-def send_email(
+def enqueue_email(
     *,
+    session: Session,
     email_to: str,
     subject: str = "",
     html_content: str = "",
-) -> None:
+) -> EmailOutbox:
+    """
+    Queue an email for app/email_worker.py to deliver.
+
+    The email is only added to the session. The caller commits it together
+    with its own changes, so it is only sent if they are saved.
+    """
     assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    email = EmailOutbox(email_to=email_to, subject=subject, html_content=html_content)
+    session.add(email)
+    return email
 
 
 def generate_test_email(email_to: str) -> EmailData:
@@ -0,0 +1,90 @@
+"""Compare throughput of the sync and async request paths.
+
+Start the API twice, once with ``ASYNC_DB=false`` and once with
+``ASYNC_DB=true``, then point this script at each instance:
+
+    python -m benchmarks.async_vs_sync --base-url http://localhost:8000 \
+        --concurrency 64 --requests 2000
+
+The script logs in as the first superuser and hammers a mixed read/write
+workload, writing a JSON summary to stdout.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+
+from app.core.config import settings
+
+
+async def _login(client: httpx.AsyncClient) -> dict[str, str]:
+    r = await client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def _request(
+    client: httpx.AsyncClient, headers: dict[str, str], n: int
+) -> httpx.Response:
+    if n % 10 == 0:
+        return await client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=headers,
+            json={"title": f"Benchmark incident {n}"},
+        )
+    if n % 2 == 0:
+        return await client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    return await client.get(
+        f"{settings.API_V1_STR}/incidents/", headers=headers, params={"limit": 20}
+    )
+
+
+async def run(base_url: str, concurrency: int, requests: int) -> dict[str, float]:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        headers = await _login(client)
+        semaphore = asyncio.Semaphore(concurrency)
+        errors = 0
+
+        async def one(n: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                r = await _request(client, headers, n)
+                if r.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(n) for n in range(requests)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.base_url, args.concurrency, args.requests))
+    sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Measure the cost of rendering an email template.
+
+Compares compiling the template from disk on every call, which is what
+``render_email_template`` used to do, with the shared cached environment:
+
+    python -m benchmarks.email_templates --iterations 2000
+
+Writes a JSON summary with the mean render time of each approach to stdout.
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from jinja2 import Template
+
+from app.utils import EMAIL_TEMPLATES_DIR, get_email_environment
+
+TEMPLATE_NAME = "reset_password.html"
+CONTEXT: dict[str, Any] = {
+    "project_name": "Incident Tracker",
+    "username": "user@example.com",
+    "email": "user@example.com",
+    "valid_hours": 48,
+    "link": "http://localhost:5173/reset-password?token=benchmark",
+}
+
+
+def _uncached() -> str:
+    template_str = (EMAIL_TEMPLATES_DIR / TEMPLATE_NAME).read_text()
+    return Template(template_str).render(CONTEXT)
+
+
+def _cached() -> str:
+    return get_email_environment().get_template(TEMPLATE_NAME).render(CONTEXT)
+
+
+def _mean_microseconds(render: Callable[[], str], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def run(iterations: int) -> dict[str, float]:
+    start = time.perf_counter()
+    get_email_environment()
+    warmup = time.perf_counter() - start
+    uncached = _mean_microseconds(_uncached, iterations)
+    cached = _mean_microseconds(_cached, iterations)
+    return {
+        "iterations": iterations,
+        "warmup_ms": round(warmup * 1000, 2),
+        "uncached_us": round(uncached, 1),
+        "cached_us": round(cached, 1),
+        "speedup": round(uncached / cached, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    sys.stdout.write(json.dumps(run(args.iterations)) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Drive a mixed user workload against a running API and report latency.
+
+Seed data with ``benchmarks.seed`` first, then run:
+
+    python -m benchmarks.load --base-url http://localhost:8000 \
+        --users 1000 --concurrency 50 --duration 60
+
+Each virtual user logs in as one of the seeded users and loops over a
+weighted mix of login, list, detail, create, update and comment requests.
+Writes a JSON report with RPS and p50/p95/p99 latency overall and per
+operation to stdout, so runs against different releases can be compared.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+API = settings.API_V1_STR
+WEIGHTS = {
+    "login": 2,
+    "list_incidents": 35,
+    "detail": 25,
+    "create": 8,
+    "update": 10,
+    "list_comments": 12,
+    "comment": 8,
+}
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 2) if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 2),
+        "p95": round(cuts[94] * 1000, 2),
+        "p99": round(cuts[98] * 1000, 2),
+    }
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        email: str,
+        password: str,
+        rng: random.Random,
+        record: Callable[[str, float, bool], None],
+    ) -> None:
+        self.client = client
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.record = record
+        self.headers: dict[str, str] = {}
+        self.incident_ids: list[str] = []
+
+    async def _timed(
+        self, operation: str, request: Awaitable[httpx.Response]
+    ) -> httpx.Response | None:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.record(operation, time.perf_counter() - start, False)
+            return None
+        self.record(operation, time.perf_counter() - start, response.is_success)
+        return response if response.is_success else None
+
+    def _incident_id(self) -> str | None:
+        return self.rng.choice(self.incident_ids) if self.incident_ids else None
+
+    async def login(self) -> None:
+        response = await self._timed(
+            "login",
+            self.client.post(
+                f"{API}/login/access-token",
+                data={"username": self.email, "password": self.password},
+            ),
+        )
+        if response is not None:
+            token = response.json()["access_token"]
+            self.headers = {"Authorization": f"Bearer {token}"}
+
+    async def list_incidents(self) -> None:
+        response = await self._timed(
+            "list_incidents",
+            self.client.get(
+                f"{API}/incidents/", headers=self.headers, params={"limit": 20}
+            ),
+        )
+        if response is not None:
+            ids = [incident["id"] for incident in response.json()["data"]]
+            # Keep a bounded pool of known ids for the detail/update requests
+            self.incident_ids = (ids + self.incident_ids)[:100]
+
+    async def detail(self) -> None:
+        if (incident_id := self._incident_id()) is None:
+            return await self.create()
+        await self._timed(
+            "detail",
+            self.client.get(f"{API}/incidents/{incident_id}", headers=self.headers),
+        )
+
+    async def create(self) -> None:
+        response = await self._timed(
+            "create",
+            self.client.post(
+                f"{API}/incidents/",
+                headers=self.headers,
+                json={
+                    "title": f"Load test incident {self.rng.getrandbits(32)}",
+                    "description": "Created by benchmarks.load",
+                    "priority": self.rng.choice(["low", "medium", "high"]),
+                },
+            ),
+        )
+        if response is not None:
+            self.incident_ids.insert(0, response.json()["id"])
+
+    async def update(self) -> None:
+        if (incident_id := self._incident_id()) is None:
+            return await self.create()
+        await self._timed(
+            "update",
+            self.client.put(
+                f"{API}/incidents/{incident_id}",
+                headers=self.headers,
+                json={"status": self.rng.choice(["in_progress", "resolved", "open"])},
+            ),
+        )
+
+    async def list_comments(self) -> None:
+        if (incident_id := self._incident_id()) is None:
+            return await self.create()
+        await self._timed(
+            "list_comments",
+            self.client.get(
+                f"{API}/incidents/{incident_id}/comments/", headers=self.headers
+            ),
+        )
+
+    async def comment(self) -> None:
+        if (incident_id := self._incident_id()) is None:
+            return await self.create()
+        await self._timed(
+            "comment",
+            self.client.post(
+                f"{API}/incidents/{incident_id}/comments/",
+                headers=self.headers,
+                json={"content": "Looking into this, load test comment."},
+            ),
+        )
+
+    async def run(self, deadline: float) -> None:
+        await self.login()
+        if not self.headers:
+            return
+        await self.list_incidents()
+        operations: list[Callable[[], Awaitable[None]]] = [
+            getattr(self, name) for name in WEIGHTS
+        ]
+        weights = list(WEIGHTS.values())
+        while time.perf_counter() < deadline:
+            await self.rng.choices(operations, weights)[0]()
+
+
+async def run(
+    *,
+    base_url: str,
+    users: int,
+    user_prefix: str,
+    password: str,
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict[str, Any]:
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+
+    def record(operation: str, seconds: float, ok: bool) -> None:
+        samples[operation].append(seconds)
+        if not ok:
+            errors[operation] += 1
+
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=concurrency)
+    timeout = httpx.Timeout(30.0)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=timeout
+    ) as client:
+        virtual_users = [
+            VirtualUser(
+                client,
+                email=f"{user_prefix}-{rng.randrange(users)}@example.com",
+                password=password,
+                rng=random.Random(rng.getrandbits(64)),
+                record=record,
+            )
+            for _ in range(concurrency)
+        ]
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*(user.run(deadline) for user in virtual_users))
+        elapsed = time.perf_counter() - start
+
+    all_samples = [seconds for values in samples.values() for seconds in values]
+    return {
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "duration_seconds": round(elapsed, 3),
+        "requests": len(all_samples),
+        "errors": sum(errors.values()),
+        "rps": round(len(all_samples) / elapsed, 1),
+        "latency_ms": _percentiles(all_samples),
+        "operations": {
+            operation: {
+                "requests": len(values),
+                "errors": errors[operation],
+                "rps": round(len(values) / elapsed, 1),
+                "latency_ms": _percentiles(values),
+            }
+            for operation, values in sorted(samples.items())
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument(
+        "--users", type=int, default=100, help="number of seeded users to log in as"
+    )
+    parser.add_argument("--user-prefix", default="bench")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = asyncio.run(
+        run(
+            base_url=args.base_url,
+            users=args.users,
+            user_prefix=args.user_prefix,
+            password=args.password,
+            concurrency=args.concurrency,
+            duration=args.duration,
+            seed=args.seed,
+        )
+    )
+    sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
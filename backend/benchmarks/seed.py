@@ -0,0 +1,266 @@
+"""Bulk-load synthetic users, incidents and comments for load testing.
+
+Rows are streamed with COPY, so even the largest scales load in minutes:
+
+    python -m benchmarks.seed --incidents 1000000
+
+Owners are skewed so a few users hold most incidents, most incidents are
+resolved, and comment threads vary in length. Every seeded user can log in
+as ``<prefix>-<n>@example.com`` with the ``--password`` given here, which is
+what ``benchmarks.load`` expects. Writes a JSON summary to stdout.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+from app.core.security import get_password_hash
+from app.models import IncidentCategory, IncidentPriority, IncidentStatus
+
+STATUS_WEIGHTS = {
+    IncidentStatus.OPEN: 20,
+    IncidentStatus.IN_PROGRESS: 15,
+    IncidentStatus.RESOLVED: 65,
+}
+PRIORITY_WEIGHTS = {
+    IncidentPriority.LOW: 30,
+    IncidentPriority.MEDIUM: 45,
+    IncidentPriority.HIGH: 20,
+    IncidentPriority.CRITICAL: 5,
+}
+CATEGORY_WEIGHTS = {
+    IncidentCategory.BUG: 55,
+    IncidentCategory.FEATURE_REQUEST: 20,
+    IncidentCategory.QUESTION: 20,
+    IncidentCategory.DOCUMENTATION: 5,
+}
+WORDS = (
+    "api timeout login error deploy database cache queue latency report "
+    "dashboard export email search payment webhook session crash upload "
+    "permission invoice mobile sync retry config"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def _skewed_index(rng: random.Random, size: int) -> int:
+    # Cubing a uniform sample piles most picks onto the first indexes
+    return int(size * rng.random() ** 3)
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class SyntheticData:
+    """
+    Deterministic row streams for one seed.
+
+    Incidents are regenerated from their own seeded RNG when writing
+    comments, so no per-incident state is held in memory at 10M rows.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: int,
+        users: int,
+        incidents: int,
+        comments_per_incident: float,
+        prefix: str,
+        hashed_password: str,
+    ) -> None:
+        self.seed = seed
+        self.users = users
+        self.incidents = incidents
+        self.comments_per_incident = comments_per_incident
+        self.prefix = prefix
+        self.hashed_password = hashed_password
+        self.now = datetime.now(timezone.utc)
+        rng = random.Random(f"{seed}-users")
+        self.user_ids = [_uuid(rng) for _ in range(users)]
+        self.comment_count = 0
+
+    def user_rows(self) -> Iterator[tuple[Any, ...]]:
+        created_at = self.now - timedelta(days=400)
+        for n, user_id in enumerate(self.user_ids):
+            yield (
+                user_id,
+                f"{self.prefix}-{n}@example.com",
+                True,
+                False,
+                f"Benchmark User {n}",
+                self.hashed_password,
+                created_at,
+            )
+
+    def incident_rows(self) -> Iterator[tuple[Any, ...]]:
+        rng = random.Random(f"{self.seed}-incidents")
+        statuses, status_weights = zip(*STATUS_WEIGHTS.items(), strict=True)
+        priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items(), strict=True)
+        categories, category_weights = zip(*CATEGORY_WEIGHTS.items(), strict=True)
+        for _ in range(self.incidents):
+            status = rng.choices(statuses, status_weights)[0]
+            created_at = self.now - timedelta(seconds=rng.uniform(0, 365 * 86400))
+            resolved_at = None
+            if status == IncidentStatus.RESOLVED:
+                resolved_at = min(
+                    created_at + timedelta(seconds=rng.expovariate(1 / 86400)),
+                    self.now,
+                )
+            assignee_id = (
+                self.user_ids[rng.randrange(self.users)] if rng.random() < 0.6 else None
+            )
+            yield (
+                _uuid(rng),
+                _sentence(rng, rng.randint(3, 8)),
+                _sentence(rng, rng.randint(8, 30))[:255],
+                status.name,
+                rng.choices(priorities, priority_weights)[0].name,
+                rng.choices(categories, category_weights)[0].name,
+                self.user_ids[_skewed_index(rng, self.users)],
+                assignee_id,
+                created_at,
+                resolved_at or created_at,
+                resolved_at,
+            )
+
+    def comment_rows(self) -> Iterator[tuple[Any, ...]]:
+        rng = random.Random(f"{self.seed}-comments")
+        # Geometric thread lengths averaging comments_per_incident: most
+        # threads are short and a few are long
+        keep_going = self.comments_per_incident / (self.comments_per_incident + 1)
+        for incident in self.incident_rows():
+            incident_id, owner_id, created_at = incident[0], incident[6], incident[8]
+            while rng.random() < keep_going:
+                author_id = (
+                    owner_id
+                    if rng.random() < 0.5
+                    else self.user_ids[rng.randrange(self.users)]
+                )
+                commented_at = created_at + timedelta(seconds=rng.expovariate(1 / 7200))
+                self.comment_count += 1
+                yield (
+                    _uuid(rng),
+                    _sentence(rng, rng.randint(5, 40)),
+                    commented_at,
+                    commented_at,
+                    author_id,
+                    incident_id,
+                )
+
+
+def _copy(cursor: Any, statement: str, rows: Iterator[tuple[Any, ...]]) -> None:
+    with cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def seed(
+    *,
+    incidents: int,
+    users: int,
+    comments_per_incident: float,
+    prefix: str,
+    password: str,
+    seed_value: int,
+) -> dict[str, Any]:
+    data = SyntheticData(
+        seed=seed_value,
+        users=users,
+        incidents=incidents,
+        comments_per_incident=comments_per_incident,
+        prefix=prefix,
+        hashed_password=get_password_hash(password),
+    )
+    start = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        # Skip row triggers (change events, stats rollups, comment counts) and
+        # FK checks while loading; the derived data is rebuilt below. Needs a
+        # superuser role.
+        cursor.execute("SET session_replication_role = replica")
+        _copy(
+            cursor,
+            'COPY "user" (id, email, is_active, is_superuser, full_name, '
+            "hashed_password, created_at) FROM STDIN",
+            data.user_rows(),
+        )
+        _copy(
+            cursor,
+            "COPY incident (id, title, description, status, priority, category, "
+            "owner_id, assignee_id, created_at, updated_at, resolved_at) "
+            "FROM STDIN",
+            data.incident_rows(),
+        )
+        _copy(
+            cursor,
+            "COPY comment (id, content, created_at, updated_at, author_id, "
+            "incident_id) FROM STDIN",
+            data.comment_rows(),
+        )
+        cursor.execute("SET session_replication_role = DEFAULT")
+        connection.commit()
+    finally:
+        connection.close()
+    loaded = time.perf_counter()
+
+    with Session(engine) as session:
+        crud.rebuild_incident_stats(session=session)
+        crud.repair_incident_activity(session=session)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.exec_driver_sql('ANALYZE "user", incident, comment')
+    finished = time.perf_counter()
+
+    return {
+        "users": users,
+        "incidents": incidents,
+        "comments": data.comment_count,
+        "user_prefix": prefix,
+        "load_seconds": round(loaded - start, 2),
+        "total_seconds": round(finished - start, 2),
+        "rows_per_second": round(
+            (users + incidents + data.comment_count) / (loaded - start)
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incidents", type=int, default=10_000)
+    parser.add_argument(
+        "--users", type=int, help="defaults to one user per 100 incidents"
+    )
+    parser.add_argument("--comments-per-incident", type=float, default=3.0)
+    parser.add_argument(
+        "--prefix", default="bench", help="seeded emails are <prefix>-<n>@..."
+    )
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    result = seed(
+        incidents=args.incidents,
+        users=args.users or max(args.incidents // 100, 10),
+        comments_per_incident=args.comments_per_incident,
+        prefix=args.prefix,
+        password=args.password,
+        seed_value=args.seed,
+    )
+    sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import importlib
+import uuid
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+import app.api.main
+from app.api.routes import async_routes
+from app.core.config import settings
+from tests.utils.comment import create_random_comment
+from tests.utils.incident import create_random_incident
+from tests.utils.utils import get_superuser_token_headers
+
+
+@pytest.fixture(scope="module")
+def async_client() -> Generator[TestClient, None, None]:
+    app = FastAPI()
+    app.include_router(async_routes.router, prefix=settings.API_V1_STR)
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(scope="module")
+def async_db_client() -> Generator[TestClient, None, None]:
+    # The full API router as it is mounted with ASYNC_DB on, async routes first
+    with patch("app.core.config.settings.ASYNC_DB", True):
+        api = importlib.reload(app.api.main)
+    application = FastAPI()
+    application.include_router(api.api_router, prefix=settings.API_V1_STR)
+    try:
+        with TestClient(application) as c:
+            yield c
+    finally:
+        importlib.reload(app.api.main)
+
+
+def test_async_login_and_read_user_me(async_client: TestClient) -> None:
+    headers = get_superuser_token_headers(async_client)
+    r = async_client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["email"] == settings.FIRST_SUPERUSER
+
+
+def test_async_incident_and_comments(async_client: TestClient) -> None:
+    headers = get_superuser_token_headers(async_client)
+    r = async_client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=headers,
+        json={"title": "Async", "description": "Created on the async path"},
+    )
+    assert r.status_code == 200
+    incident_id = r.json()["id"]
+
+    r = async_client.get(
+        f"{settings.API_V1_STR}/incidents/{incident_id}", headers=headers
+    )
+    assert r.status_code == 200
+    assert r.json()["title"] == "Async"
+
+    r = async_client.post(
+        f"{settings.API_V1_STR}/incidents/{incident_id}/comments/",
+        headers=headers,
+        json={"content": "Async comment"},
+    )
+    assert r.status_code == 200
+
+    r = async_client.get(
+        f"{settings.API_V1_STR}/incidents/{incident_id}/comments/", headers=headers
+    )
+    assert r.status_code == 200
+    assert r.json()["count"] == 1
+    assert r.json()["data"][0]["content"] == "Async comment"
+
+    r = async_client.get(f"{settings.API_V1_STR}/incidents/", headers=headers)
+    assert r.status_code == 200
+    assert r.json()["count"] >= 1
+
+
+def test_async_read_incident_not_found(async_client: TestClient) -> None:
+    headers = get_superuser_token_headers(async_client)
+    r = async_client.get(
+        f"{settings.API_V1_STR}/incidents/{uuid.uuid4()}", headers=headers
+    )
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Incident not found"
+
+
+def test_async_db_read_incident_expand(
+    async_db_client: TestClient, db: Session
+) -> None:
+    incident = create_random_incident(db)
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    headers = get_superuser_token_headers(async_db_client)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}"
+    paths = [route.path for route in async_db_client.app.routes]  # type: ignore[attr-defined]
+    assert paths.index(f"{settings.API_V1_STR}/incidents/{{id:uuid}}") < paths.index(
+        f"{settings.API_V1_STR}/incidents/{{id}}"
+    )
+
+    r = async_db_client.get(url, headers=headers)
+    assert r.status_code == 200
+    assert not {"owner", "comments"} & r.json().keys()
+    etag = r.headers["ETag"]
+
+    params = {"expand": "comments,owner,authors"}
+    r = async_db_client.get(
+        url, headers={**headers, "If-None-Match": etag}, params=params
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["owner"]["id"] == str(incident.owner_id)
+    assert "assignee" not in content
+    assert [c["id"] for c in content["comments"]] == [str(comment.id)]
+    assert content["comments"][0]["author"]["id"] == str(incident.owner_id)
+    expanded_etag = r.headers["ETag"]
+    assert expanded_etag != etag
+
+    r = async_db_client.get(
+        url, headers={**headers, "If-None-Match": expanded_etag}, params=params
+    )
+    assert r.status_code == 304
+
+    r = async_db_client.get(url, headers=headers, params={"expand": "bogus"})
+    assert r.status_code == 400
@@ -1,11 +1,16 @@
 import uuid
+from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app import crud
 from app.core.config import settings
+from app.models import Comment, IncidentCreate
 from tests.utils.incident import create_random_incident
 from tests.utils.comment import create_random_comment
+from tests.utils.queries import query_budget
+from tests.utils.user import create_random_user
 
 
 def test_create_comment(
@@ -43,6 +48,192 @@ def test_read_comments(
     assert len(content["data"]) >= 2
 
 
+def test_read_comments_query_budget(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    for _ in range(3):
+        create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    # Auth user lookup, then one query for the access check, count and page
+    with query_budget(2):
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/{incident.id}/comments/",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    assert len(response.json()["data"]) == 3
+
+
+def test_read_comments_past_last_page(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/{incident.id}/comments/",
+        headers=superuser_token_headers,
+        params={"skip": 10},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["data"] == []
+    assert content["count"] == 2
+
+
+def test_read_comments_keyset_pages(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    comments = [
+        create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+        for _ in range(5)
+    ]
+    contents = [comment.content for comment in comments]
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}/comments/"
+
+    r = client.get(
+        url, headers=superuser_token_headers, params={"latest": True, "limit": 2}
+    )
+    assert r.status_code == 200
+    page = r.json()
+    assert [c["content"] for c in page["data"]] == contents[3:]
+    assert page["count"] == 5
+    assert page["next_cursor"] is None
+
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={"before": page["prev_cursor"], "limit": 2},
+    )
+    page = r.json()
+    assert [c["content"] for c in page["data"]] == contents[1:3]
+
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={"before": page["prev_cursor"], "limit": 2},
+    )
+    oldest = r.json()
+    assert [c["content"] for c in oldest["data"]] == contents[:1]
+    assert oldest["prev_cursor"] is None
+
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={"after": oldest["next_cursor"], "limit": 3},
+    )
+    page = r.json()
+    assert [c["content"] for c in page["data"]] == contents[1:4]
+    assert page["next_cursor"] is not None
+
+
+def test_read_comments_invalid_paging(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}/comments/"
+    r = client.get(url, headers=superuser_token_headers, params={"before": "nope"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+    r = client.get(
+        url,
+        headers=superuser_token_headers,
+        params={"latest": True, "after": "nope"},
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Use only one of before, after and latest"
+
+
+def test_read_comments_incident_not_found(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/{uuid.uuid4()}/comments/",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Incident not found"
+
+
+def test_read_comments_not_enough_permissions(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/{incident.id}/comments/",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Not enough permissions"
+
+
+def test_read_comments_etag(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}/comments/"
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    client.delete(f"{url}{comment.id}", headers=superuser_token_headers)
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_read_comments_etag_query_budget(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}/comments/"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+    # Auth user lookup and the version check, without reading any comments
+    with query_budget(2) as statements:
+        response = client.get(
+            url, headers={**superuser_token_headers, "If-None-Match": etag}
+        )
+    assert response.status_code == 304
+    assert not any("FROM comment" in statement for statement in statements)
+
+
+def test_read_comments_count_is_exact(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    for _ in range(2):
+        create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    # The incident's comment_count is exact and free, whatever the list setting
+    with (
+        patch("app.core.config.settings.LIST_COUNT_STRATEGY", "capped"),
+        patch("app.core.config.settings.LIST_COUNT_CAP", 1),
+    ):
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/{incident.id}/comments/",
+            headers=superuser_token_headers,
+            params={"limit": 1},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 2
+    assert content["count_strategy"] == "exact"
+    assert len(content["data"]) == 1
+
+
 def test_delete_comment(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -59,6 +250,41 @@ def test_delete_comment(
     assert content["message"] == "Comment deleted successfully"
 
 
+def test_delete_comment_not_author(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    owner = crud.get_user_by_email(session=db, email=settings.EMAIL_TEST_USER)
+    assert owner
+    incident = crud.create_incident(
+        session=db, incident_in=IncidentCreate(title="Owned"), owner_id=owner.id
+    )
+    other = create_random_user(db)
+    comment = create_random_comment(db, incident_id=incident.id, author_id=other.id)
+    response = client.delete(
+        f"{settings.API_V1_STR}/incidents/{incident.id}/comments/{comment.id}",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Not enough permissions"
+    assert db.get(Comment, comment.id)
+
+
+def test_delete_comment_query_budget(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    # Auth user lookup and the DELETE ... USING incident
+    with query_budget(2):
+        response = client.delete(
+            f"{settings.API_V1_STR}/incidents/{incident.id}/comments/{comment.id}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+
+
 def test_delete_comment_not_found(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -99,3 +325,18 @@ def test_create_comment_not_enough_permissions(
     assert response.status_code == 403
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def test_create_comment_query_budget(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    # Auth user lookup and the guarded INSERT ... SELECT
+    with query_budget(2):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/{incident.id}/comments/",
+            headers=superuser_token_headers,
+            json={"content": "Within budget"},
+        )
+    assert response.status_code == 200
+    assert response.json()["content"] == "Within budget"
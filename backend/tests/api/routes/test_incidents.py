@@ -1,11 +1,36 @@
+import asyncio
+import csv
+import io
+import json
 import uuid
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import patch
 
+import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session
+from sqlalchemy import text
+from sqlmodel import Session, col, func, select
 
+from app import crud
+from app.api.counting import clear_count_cache
+from app.api.routes.incidents import _stream_incident_events
+from app.core import security
 from app.core.config import settings
+from app.models import (
+    BULK_MAX_ITEMS,
+    Incident,
+    IncidentEvent,
+    IncidentStatsRollup,
+    UserAuth,
+    UserUpdate,
+)
+from tests.utils.comment import create_random_comment
 from tests.utils.incident import create_random_incident
+from tests.utils.queries import query_budget
 from tests.utils.user import create_random_user
+from tests.utils.utils import random_lower_string
 
 
 def test_create_incident(
@@ -89,6 +114,174 @@ def test_read_incident(
     assert content["category"] == "bug"
 
 
+def test_read_incident_query_budget(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    # Auth user lookup and the incident itself
+    with query_budget(2):
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/{incident.id}",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_read_incident_etag(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}"
+    response = client.get(url, headers=superuser_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+    client.put(url, headers=superuser_token_headers, json={"title": "Changed"})
+    response = client.get(
+        url, headers={**superuser_token_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["title"] == "Changed"
+
+
+def test_read_incident_comment_activity(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}"
+
+    def read() -> tuple[int, datetime, str]:
+        response = client.get(url, headers=superuser_token_headers)
+        content = response.json()
+        return (
+            content["comment_count"],
+            datetime.fromisoformat(content["last_activity_at"]),
+            response.headers["ETag"],
+        )
+
+    count, created_activity, created_etag = read()
+    assert count == 0
+
+    comments = [
+        create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+        for _ in range(2)
+    ]
+    count, commented_activity, commented_etag = read()
+    assert count == 2
+    assert commented_activity == comments[-1].updated_at
+    assert commented_etag != created_etag
+
+    client.delete(f"{url}/comments/{comments[-1].id}", headers=superuser_token_headers)
+    count, deleted_activity, deleted_etag = read()
+    assert count == 1
+    assert deleted_activity == comments[0].updated_at
+    assert deleted_etag not in (created_etag, commented_etag)
+    assert created_activity < deleted_activity
+
+
+def test_read_incident_expand(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    assignee = create_random_user(db)
+    incident.assignee_id = assignee.id
+    db.add(incident)
+    db.commit()
+    comments = [
+        create_random_comment(db, incident_id=incident.id, author_id=author_id)
+        for author_id in (incident.owner_id, assignee.id, create_random_user(db).id)
+    ]
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}"
+
+    # Auth user lookup, the incident, owner, assignee, comments and authors
+    with query_budget(6):
+        response = client.get(
+            url,
+            headers=superuser_token_headers,
+            params={"expand": "comments,owner,assignee,authors"},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["owner"] == {"id": str(incident.owner_id), "full_name": None}
+    assert content["assignee"]["id"] == str(assignee.id)
+    assert [comment["id"] for comment in content["comments"]] == [
+        str(comment.id) for comment in comments
+    ]
+    assert [comment["author"]["id"] for comment in content["comments"]] == [
+        str(comment.author_id) for comment in comments
+    ]
+    assert content["comments_next_cursor"] is None
+
+    response = client.get(
+        url, headers=superuser_token_headers, params={"expand": "comments"}
+    )
+    content = response.json()
+    assert "owner" not in content
+    assert "author" not in content["comments"][0]
+
+    response = client.get(url, headers=superuser_token_headers)
+    assert not {"owner", "assignee", "comments"} & response.json().keys()
+
+
+def test_read_incident_expand_etag(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    url = f"{settings.API_V1_STR}/incidents/{incident.id}"
+    etag = client.get(url, headers=superuser_token_headers).headers["ETag"]
+
+    params = {"expand": "owner"}
+    response = client.get(
+        url,
+        headers={**superuser_token_headers, "If-None-Match": etag},
+        params=params,
+    )
+    assert response.status_code == 200
+    expanded_etag = response.headers["ETag"]
+    assert expanded_etag != etag
+
+    response = client.get(
+        url,
+        headers={**superuser_token_headers, "If-None-Match": expanded_etag},
+        params=params,
+    )
+    assert response.status_code == 304
+
+
+def test_read_incident_invalid_expand(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/{incident.id}",
+        headers=superuser_token_headers,
+        params={"expand": "owner,watchers"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid expand value"
+
+
+def test_read_incident_etag_not_enough_permissions(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/{incident.id}",
+        headers={**normal_user_token_headers, "If-None-Match": "*"},
+    )
+    assert response.status_code == 403
+
+
 def test_read_incident_not_found(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
@@ -128,6 +321,702 @@ def test_read_incidents(
     assert len(content["data"]) >= 2
 
 
+def test_read_incidents_cursor_walk(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    created_ids = set()
+    for i in range(3):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            json={"title": f"Cursor {i}"},
+        )
+        created_ids.add(response.json()["id"])
+
+    seen: list[str] = []
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        params={"limit": 2},
+    )
+    while True:
+        assert response.status_code == 200
+        content = response.json()
+        seen.extend(incident["id"] for incident in content["data"])
+        if content["next_cursor"] is None:
+            break
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            params={"limit": 2, "cursor": content["next_cursor"]},
+        )
+    assert len(seen) == len(set(seen))
+    assert created_ids <= set(seen)
+
+
+def test_read_incidents_cursor_pages(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    assignee = create_random_user(db)
+    for _ in range(2):
+        incident = create_random_incident(db)
+        incident.assignee_id = assignee.id
+        db.add(incident)
+    db.commit()
+    url = f"{settings.API_V1_STR}/incidents/"
+    params: dict[str, Any] = {"assignee_id": str(assignee.id), "limit": 2}
+
+    # An exactly full last page has no next page to ask for
+    content = client.get(url, headers=superuser_token_headers, params=params).json()
+    assert len(content["data"]) == 2
+    assert content["count"] == 2
+    assert content["next_cursor"] is None
+
+    params["limit"] = 1
+    content = client.get(url, headers=superuser_token_headers, params=params).json()
+    assert content["count"] == 2
+    params["cursor"] = content["next_cursor"]
+    # The total isn't recounted for every page of a walk
+    with query_budget(2):
+        response = client.get(url, headers=superuser_token_headers, params=params)
+    content = response.json()
+    assert len(content["data"]) == 1
+    assert content["count"] is None
+    assert content["next_cursor"] is None
+
+
+def test_read_incidents_invalid_cursor(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=superuser_token_headers,
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+    content = response.json()
+    assert content["detail"] == "Invalid cursor"
+
+
+def test_read_incidents_capped_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_incident(db)
+    create_random_incident(db)
+    with (
+        patch("app.core.config.settings.LIST_COUNT_STRATEGY", "capped"),
+        patch("app.core.config.settings.LIST_COUNT_CAP", 1),
+    ):
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["count_strategy"] == "capped"
+
+
+def test_read_incidents_estimated_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    create_random_incident(db)
+    with (
+        patch("app.core.config.settings.LIST_COUNT_STRATEGY", "estimate"),
+        patch("app.core.config.settings.LIST_COUNT_CAP", 0),
+    ):
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] > 0
+    assert content["count_strategy"] == "estimate"
+
+
+def test_read_incidents_cached_count(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    clear_count_cache()
+    with patch("app.core.config.settings.LIST_COUNT_STRATEGY", "cached"):
+        first = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+        ).json()
+        create_random_incident(db)
+        second = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+        ).json()
+    assert first["count_strategy"] == "exact"
+    assert second["count_strategy"] == "cached"
+    assert second["count"] == first["count"]
+
+
+def test_read_incidents_filtered(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    assignee = create_random_user(db)
+    data = {
+        "title": "Critical outage",
+        "priority": "critical",
+        "category": "bug",
+        "assignee_id": str(assignee.id),
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    created = response.json()
+    client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        json={"title": "Minor question", "priority": "low", "category": "question"},
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        params={
+            "status": "open",
+            "priority": "critical",
+            "assignee_id": str(assignee.id),
+        },
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert [incident["id"] for incident in content["data"]] == [created["id"]]
+
+
+def test_read_incidents_created_window(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        params={"created_after": "2999-01-01T00:00:00Z"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 0
+    assert content["data"] == []
+
+
+def test_read_incidents_sorted_by_priority(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    for priority in ("low", "critical", "medium"):
+        client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            json={"title": f"Sorted {priority}", "priority": priority},
+        )
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        params={"sort": "-priority"},
+    )
+    assert response.status_code == 200
+    order = ["critical", "high", "medium", "low"]
+    priorities = [incident["priority"] for incident in response.json()["data"]]
+    assert priorities == sorted(priorities, key=order.index)
+
+
+def test_read_incidents_cursor_requires_keyset_sort(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=superuser_token_headers,
+        params={"sort": "-priority", "cursor": "anything"},
+    )
+    assert response.status_code == 400
+    content = response.json()
+    assert (
+        content["detail"]
+        == "Cursor pagination requires sorting by created_at or last_activity_at"
+    )
+
+
+def test_read_incidents_sorted_by_last_activity(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    ids = []
+    for i in range(3):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            json={"title": f"Activity {i}"},
+        )
+        ids.append(response.json()["id"])
+    # Commenting on the oldest incident moves it to the front
+    client.post(
+        f"{settings.API_V1_STR}/incidents/{ids[0]}/comments/",
+        headers=normal_user_token_headers,
+        json={"content": "Still happening"},
+    )
+
+    seen: list[dict[str, Any]] = []
+    params: dict[str, Any] = {"sort": "-last_activity_at", "limit": 2}
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        seen.extend(content["data"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    assert seen[0]["id"] == ids[0]
+    assert seen[0]["comment_count"] == 1
+    assert [incident["id"] for incident in seen[1:3]] == [ids[2], ids[1]]
+    assert len(seen) == len({incident["id"] for incident in seen})
+
+
+def test_search_incidents(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    word = random_lower_string()
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        json={"title": f"Database {word}", "description": "Replica lag"},
+    )
+    created = response.json()
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/search",
+        headers=normal_user_token_headers,
+        params={"q": word},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [hit["id"] for hit in content["data"]] == [created["id"]]
+    assert content["data"][0]["rank"] > 0
+    assert content["next_cursor"] is None
+
+
+def test_search_incidents_hides_other_owners(
+    client: TestClient,
+    superuser_token_headers: dict[str, str],
+    normal_user_token_headers: dict[str, str],
+) -> None:
+    word = random_lower_string()
+    client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=superuser_token_headers,
+        json={"title": word},
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/search",
+        headers=normal_user_token_headers,
+        params={"q": word},
+    )
+    assert response.status_code == 200
+    assert response.json()["data"] == []
+
+
+def test_search_incidents_include_comments(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/search",
+        headers=superuser_token_headers,
+        params={"q": comment.content},
+    )
+    assert response.json()["data"] == []
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/search",
+        headers=superuser_token_headers,
+        params={"q": comment.content, "include_comments": True},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [hit["id"] for hit in content["data"]] == [str(incident.id)]
+
+
+def test_search_incidents_cursor_walk(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    word = random_lower_string()
+    created_ids = set()
+    for _ in range(3):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+            json={"title": word},
+        )
+        created_ids.add(response.json()["id"])
+    seen: list[str] = []
+    params: dict[str, str | int] = {"q": word, "limit": 2}
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/search",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        seen.extend(hit["id"] for hit in content["data"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    assert sorted(seen) == sorted(created_ids)
+
+
+def test_search_incidents_cursor_walk_tied_ranks(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    word = random_lower_string()
+    created_ids = set()
+    for _ in range(7):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=superuser_token_headers,
+            json={"title": f"{word} outage", "description": word},
+        )
+        created_ids.add(response.json()["id"])
+    seen: list[str] = []
+    ranks: set[float] = set()
+    params: dict[str, str | int] = {"q": word, "limit": 3}
+    while True:
+        response = client.get(
+            f"{settings.API_V1_STR}/incidents/search",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert response.status_code == 200
+        content = response.json()
+        seen.extend(hit["id"] for hit in content["data"])
+        ranks.update(hit["rank"] for hit in content["data"])
+        if content["next_cursor"] is None:
+            break
+        params["cursor"] = content["next_cursor"]
+    # Every row ties with the last row of each page
+    assert len(ranks) == 1
+    assert len(seen) == len(created_ids)
+    assert set(seen) == created_ids
+
+
+def test_create_incidents_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    data = {
+        "data": [
+            {"title": "Alert 1"},
+            {"title": "Alert 2", "priority": "critical"},
+            {"title": "Alert 3", "category": "question"},
+        ]
+    }
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["status_code"] for result in results] == [200, 200, 200]
+    assert [result["data"]["title"] for result in results] == [
+        "Alert 1",
+        "Alert 2",
+        "Alert 3",
+    ]
+    assert results[1]["data"]["priority"] == "critical"
+    assert results[2]["data"]["category"] == "question"
+    assert all(result["id"] == result["data"]["id"] for result in results)
+
+
+def test_create_incidents_bulk_too_many(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    data = {"data": [{"title": "Alert"}] * (BULK_MAX_ITEMS + 1)}
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 422
+
+
+def test_update_incidents_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Mine 1"}, {"title": "Mine 2"}]},
+    )
+    mine = [result["id"] for result in response.json()["data"]]
+    other = create_random_incident(db)
+    missing = uuid.uuid4()
+    data = {
+        "data": [
+            {"id": mine[0], "status": "resolved"},
+            {"id": str(other.id), "title": "Not mine"},
+            {"id": mine[1], "title": "Renamed", "priority": "high"},
+            {"id": str(missing), "title": "Gone"},
+        ]
+    }
+    response = client.patch(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json=data,
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["status_code"] for result in results] == [200, 403, 200, 404]
+    assert results[0]["data"]["status"] == "resolved"
+    assert results[0]["data"]["resolved_at"] is not None
+    assert results[0]["data"]["title"] == "Mine 1"
+    assert results[1]["detail"] == "Not enough permissions"
+    assert results[2]["data"]["title"] == "Renamed"
+    assert results[2]["data"]["priority"] == "high"
+    assert results[2]["data"]["resolved_at"] is None
+    assert results[3]["detail"] == "Incident not found"
+    db.refresh(other)
+    assert other.title != "Not mine"
+
+
+def test_update_incidents_bulk_reopen_clears_resolved_at(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    client.put(
+        f"{settings.API_V1_STR}/incidents/{incident.id}",
+        headers=superuser_token_headers,
+        json={"status": "resolved"},
+    )
+    response = client.patch(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=superuser_token_headers,
+        json={"data": [{"id": str(incident.id), "status": "open"}]},
+    )
+    assert response.status_code == 200
+    result = response.json()["data"][0]
+    assert result["data"]["status"] == "open"
+    assert result["data"]["resolved_at"] is None
+
+
+def test_update_incidents_bulk_duplicate_ids(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    data = {
+        "data": [
+            {"id": str(incident.id), "title": "One"},
+            {"id": str(incident.id), "title": "Two"},
+        ]
+    }
+    response = client.patch(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=superuser_token_headers,
+        json=data,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Duplicate incident ids"
+
+
+def test_delete_incidents_bulk(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Delete me"}]},
+    )
+    mine = response.json()["data"][0]["id"]
+    other = create_random_incident(db)
+    response = client.request(
+        "DELETE",
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json={"ids": [mine, str(other.id), str(uuid.uuid4())]},
+    )
+    assert response.status_code == 200
+    results = response.json()["data"]
+    assert [result["status_code"] for result in results] == [200, 403, 404]
+    assert results[0]["detail"] == "Incident deleted successfully"
+    assert db.get(Incident, uuid.UUID(mine)) is None
+    assert db.get(Incident, other.id) is not None
+
+
+def test_batch_get_incidents(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/bulk",
+        headers=normal_user_token_headers,
+        json={"data": [{"title": "Batch one"}, {"title": "Batch two"}]},
+    )
+    mine = [result["id"] for result in response.json()["data"]]
+    other = str(create_random_incident(db).id)
+    missing = str(uuid.uuid4())
+    # Auth user lookup and one query for every id
+    with query_budget(2):
+        response = client.post(
+            f"{settings.API_V1_STR}/incidents/batch-get",
+            headers=normal_user_token_headers,
+            json={"ids": [*mine, other, missing, mine[0]]},
+        )
+    assert response.status_code == 200
+    content = response.json()
+    assert list(content["found"]) == mine
+    assert content["found"][mine[1]]["title"] == "Batch two"
+    assert content["forbidden"] == [other]
+    assert content["missing"] == [missing]
+
+
+def test_batch_get_incidents_too_many(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/batch-get",
+        headers=superuser_token_headers,
+        json={"ids": [str(uuid.uuid4()) for _ in range(BULK_MAX_ITEMS + 1)]},
+    )
+    assert response.status_code == 422
+
+
+def test_export_incidents_ndjson(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        json={"title": "Exported"},
+    )
+    created = response.json()
+    other = create_random_incident(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/export",
+        headers=normal_user_token_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    ids = {row["id"] for row in rows}
+    assert created["id"] in ids
+    assert str(other.id) not in ids
+    assert all(row["owner_id"] == created["owner_id"] for row in rows)
+
+
+def test_export_incidents_csv(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    incident = create_random_incident(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/incidents/export",
+        headers=superuser_token_headers,
+        params={"format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    exported = {row["id"]: row for row in rows}
+    assert exported[str(incident.id)]["title"] == incident.title
+    assert exported[str(incident.id)]["status"] == "open"
+
+
+def test_read_incident_stats(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/incidents/stats"
+    before = client.get(url, headers=normal_user_token_headers).json()
+    response = client.post(
+        f"{settings.API_V1_STR}/incidents/",
+        headers=normal_user_token_headers,
+        json={"title": "Stats", "priority": "high"},
+    )
+    client.put(
+        f"{settings.API_V1_STR}/incidents/{response.json()['id']}",
+        headers=normal_user_token_headers,
+        json={"status": "resolved"},
+    )
+    create_random_incident(db)
+
+    response = client.get(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    after = response.json()
+    assert after["total"] == before["total"] + 1
+    assert after["by_status"]["resolved"] == before["by_status"]["resolved"] + 1
+    assert after["by_priority"]["high"] == before["by_priority"]["high"] + 1
+    assert after["mean_time_to_resolve_seconds"] is not None
+    assert len(after["backlog"]) == 30
+    today = after["backlog"][-1]
+    assert today["opened"] == before["backlog"][-1]["opened"] + 1
+    assert today["resolved"] == before["backlog"][-1]["resolved"] + 1
+    assert today["backlog"] == before["backlog"][-1]["backlog"]
+
+    crud.rebuild_incident_stats(session=db)
+    rebuilt = client.get(url, headers=normal_user_token_headers).json()
+    assert rebuilt.pop("mean_time_to_resolve_seconds") == pytest.approx(
+        after.pop("mean_time_to_resolve_seconds")
+    )
+    assert rebuilt == after
+
+
+def test_compact_incident_stats(
+    client: TestClient, normal_user_token_headers: dict[str, str], db: Session
+) -> None:
+    url = f"{settings.API_V1_STR}/incidents/stats"
+    for _ in range(2):
+        client.post(
+            f"{settings.API_V1_STR}/incidents/",
+            headers=normal_user_token_headers,
+            json={"title": "Stats"},
+        )
+    before = client.get(url, headers=normal_user_token_headers).json()
+
+    assert crud.compact_incident_stats(session=db)
+    after = client.get(url, headers=normal_user_token_headers).json()
+    assert after.pop("mean_time_to_resolve_seconds") == pytest.approx(
+        before.pop("mean_time_to_resolve_seconds")
+    )
+    assert after == before
+    rows = db.exec(
+        select(
+            IncidentStatsRollup.owner_id,
+            IncidentStatsRollup.status,
+            IncidentStatsRollup.priority,
+            func.count(),
+        ).group_by(
+            col(IncidentStatsRollup.owner_id),
+            col(IncidentStatsRollup.status),
+            col(IncidentStatsRollup.priority),
+        )
+    ).all()
+    assert all(count == 1 for *_, count in rows)
+
+
+def test_repair_incident_activity(db: Session) -> None:
+    incident = create_random_incident(db)
+    create_random_comment(db, incident_id=incident.id, author_id=incident.owner_id)
+    db.refresh(incident)
+    expected = (incident.comment_count, incident.last_activity_at)
+    assert incident.comment_count == 1
+
+    db.execute(
+        text(
+            "UPDATE incident SET comment_count = 7, last_activity_at = now() "
+            "WHERE id = :id"
+        ),
+        {"id": incident.id},
+    )
+    db.commit()
+    assert crud.repair_incident_activity(session=db, batch_size=2) >= 1
+    db.refresh(incident)
+    assert (incident.comment_count, incident.last_activity_at) == expected
+    assert crud.repair_incident_activity(session=db) == 0
+
+
 def test_update_incident(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -247,3 +1136,52 @@ def test_delete_incident_not_enough_permissions(
     assert response.status_code == 403
     content = response.json()
     assert content["detail"] == "Not enough permissions"
+
+
+def _first_chunk(stream: AsyncIterator[str]) -> str:
+    async def run() -> str:
+        try:
+            return await anext(stream)
+        finally:
+            await stream.aclose()  # type: ignore[attr-defined]
+
+    return asyncio.run(run())
+
+
+def test_stream_incidents_resumes_after_last_event_id(db: Session) -> None:
+    incident = create_random_incident(db)
+    last_event_id = db.exec(
+        select(IncidentEvent.id).where(IncidentEvent.incident_id == incident.id)
+    ).one()
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    owner = UserAuth(id=incident.owner_id, is_active=True, is_superuser=False)
+    chunk = _first_chunk(_stream_incident_events("token", owner, last_event_id))
+    assert "event: comment_created\n" in chunk
+    assert str(comment.id) in chunk
+
+
+def test_stream_incidents_resets_unknown_last_event_id(db: Session) -> None:
+    user = create_random_user(db)
+    owner = UserAuth(id=user.id, is_active=True, is_superuser=False)
+    chunk = _first_chunk(_stream_incident_events("token", owner, 0))
+    assert "event: reset\n" in chunk
+
+
+def test_stream_incidents_ends_when_user_is_deactivated(db: Session) -> None:
+    user = create_random_user(db)
+    token = security.create_access_token(user.id, timedelta(minutes=5))
+    auth_user = UserAuth(id=user.id, is_active=True, is_superuser=False)
+    crud.update_user(session=db, db_user=user, user_in=UserUpdate(is_active=False))
+
+    async def run() -> list[str]:
+        return [
+            chunk async for chunk in _stream_incident_events(token, auth_user, None)
+        ]
+
+    with (
+        patch("app.core.config.settings.INCIDENT_STREAM_HEARTBEAT_SECONDS", 0.01),
+        patch("app.core.config.settings.INCIDENT_STREAM_AUTH_CHECK_SECONDS", 0),
+    ):
+        assert asyncio.run(run()) == [": keepalive\n\n"]
@@ -0,0 +1,50 @@
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+
+def test_read_db_pool_stats(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["pool_size"] == settings.DB_POOL_SIZE
+    assert stats["checkouts"] >= 1
+    assert stats["timeouts"] >= 0
+
+
+def test_read_db_pool_stats_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert r.status_code == 403
+
+
+def test_test_email_is_queued(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    with patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"):
+        before = client.get(
+            f"{settings.API_V1_STR}/utils/email-outbox/",
+            headers=superuser_token_headers,
+        ).json()
+        r = client.post(
+            f"{settings.API_V1_STR}/utils/test-email/",
+            headers=superuser_token_headers,
+            params={"email_to": "test@example.com"},
+        )
+    assert r.status_code == 201
+    r = client.get(
+        f"{settings.API_V1_STR}/utils/email-outbox/", headers=superuser_token_headers
+    )
+    assert r.status_code == 200
+    stats = r.json()
+    assert stats["pending"] == before["pending"] + 1
+    assert stats["oldest_pending_seconds"] >= 0
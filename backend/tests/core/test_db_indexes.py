@@ -0,0 +1,208 @@
+import uuid
+from typing import Any
+
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.db import engine
+
+
+def _explain(db: Session, sql: str, **params: Any) -> str:
+    # The test tables are tiny, so without this the planner always picks a
+    # sequential scan regardless of which indexes exist.
+    db.execute(text("SET LOCAL enable_seqscan = off"))
+    rows = db.execute(text(f"EXPLAIN {sql}"), params).all()
+    db.rollback()
+    return "\n".join(row[0] for row in rows)
+
+
+def test_owner_incident_list_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE owner_id = :owner_id "
+        "ORDER BY created_at DESC, id DESC LIMIT 100",
+        owner_id=uuid.uuid4(),
+    )
+    assert "ix_incident_owner_id_created_at_id" in plan
+
+
+def test_incident_list_uses_index(db: Session) -> None:
+    plan = _explain(
+        db, "SELECT * FROM incident ORDER BY created_at DESC, id DESC LIMIT 100"
+    )
+    assert "ix_incident_created_at_id" in plan
+
+
+def test_owner_activity_sort_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE owner_id = :owner_id "
+        "ORDER BY last_activity_at DESC, id DESC LIMIT 100",
+        owner_id=uuid.uuid4(),
+    )
+    assert "ix_incident_owner_id_last_activity_at_id" in plan
+
+
+def test_activity_sort_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident ORDER BY last_activity_at DESC, id DESC LIMIT 100",
+    )
+    assert "ix_incident_last_activity_at_id" in plan
+
+
+def test_assignee_lookup_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE assignee_id = :assignee_id",
+        assignee_id=uuid.uuid4(),
+    )
+    assert "ix_incident_assignee_id_status_priority_created_at" in plan
+
+
+def test_comment_thread_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM comment WHERE incident_id = :incident_id "
+        "ORDER BY created_at ASC, id ASC LIMIT 100",
+        incident_id=uuid.uuid4(),
+    )
+    assert "ix_comment_incident_id_created_at_id" in plan
+
+
+def _seed_triage_rows(db: Session) -> uuid.UUID:
+    """
+    Load one user's incidents, few of them open and critical, next to many
+    open critical incidents of another user, then ANALYZE.
+
+    On an empty table every index costs the same and the planner picks
+    arbitrarily. With these statistics only the triage indexes avoid reading
+    rows that the owner/assignee or status/priority filters throw away. It
+    all runs in the test's transaction, so _explain's rollback removes it.
+    """
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    db.execute(
+        text(
+            'INSERT INTO "user" (id, email, is_active, is_superuser, '
+            "hashed_password) VALUES "
+            "(:user_id, :user_email, true, false, ''), "
+            "(:other_id, :other_email, true, false, '')"
+        ),
+        {
+            "user_id": user_id,
+            "user_email": f"{user_id}@example.com",
+            "other_id": other_id,
+            "other_email": f"{other_id}@example.com",
+        },
+    )
+    db.execute(
+        text(
+            "INSERT INTO incident (id, title, status, priority, category, "
+            "owner_id, assignee_id, created_at, updated_at) "
+            "SELECT gen_random_uuid(), 'Triage ' || n, "
+            "(CASE WHEN n % 4 = 0 THEN 'OPEN' ELSE 'RESOLVED' END)"
+            "::incidentstatus, "
+            "(CASE WHEN n % 20 = 0 THEN 'CRITICAL' ELSE 'LOW' END)"
+            "::incidentpriority, "
+            "'BUG'::incidentcategory, :user_id, :user_id, "
+            "now() - n * interval '1 minute', now() "
+            "FROM generate_series(1, 5000) AS n "
+            "UNION ALL "
+            "SELECT gen_random_uuid(), 'Other ' || n, 'OPEN', 'CRITICAL', 'BUG', "
+            ":other_id, :other_id, now() - n * interval '1 minute', now() "
+            "FROM generate_series(1, 5000) AS n"
+        ),
+        {"user_id": user_id, "other_id": other_id},
+    )
+    db.execute(text("ANALYZE incident"))
+    return user_id
+
+
+def test_owner_triage_filter_uses_index(db: Session) -> None:
+    owner_id = _seed_triage_rows(db)
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE owner_id = :owner_id "
+        "AND status = 'OPEN' AND priority = 'CRITICAL' "
+        "ORDER BY created_at DESC, id DESC LIMIT 100",
+        owner_id=owner_id,
+    )
+    assert "ix_incident_owner_id_status_priority_created_at" in plan
+
+
+def test_assignee_triage_filter_uses_index(db: Session) -> None:
+    assignee_id = _seed_triage_rows(db)
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE assignee_id = :assignee_id "
+        "AND status = 'OPEN' AND priority = 'CRITICAL' "
+        "ORDER BY created_at DESC, id DESC LIMIT 100",
+        assignee_id=assignee_id,
+    )
+    assert "ix_incident_assignee_id_status_priority_created_at" in plan
+
+
+def test_status_priority_sort_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE status = 'OPEN' "
+        "ORDER BY priority DESC, created_at DESC, id DESC LIMIT 100",
+    )
+    assert "ix_incident_status_priority_created_at" in plan
+
+
+def test_resolved_window_uses_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT * FROM incident WHERE resolved_at >= now() - interval '7 days'",
+    )
+    assert "ix_incident_resolved_at" in plan
+
+
+def test_incident_search_uses_gin_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT id FROM incident "
+        "WHERE search_vector @@ websearch_to_tsquery('english', :q)",
+        q="outage",
+    )
+    assert "ix_incident_search_vector" in plan
+
+
+def test_comment_search_uses_gin_index(db: Session) -> None:
+    plan = _explain(
+        db,
+        "SELECT incident_id FROM comment "
+        "WHERE to_tsvector('english'::regconfig, content) "
+        "@@ websearch_to_tsquery('english', :q)",
+        q="outage",
+    )
+    assert "ix_comment_search_vector" in plan
+
+
+def _vacuum(table: str) -> None:
+    # Index-only scans are only chosen once the visibility map is populated
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text(f"VACUUM {table}"))
+
+
+def test_incident_version_lookup_is_index_only(db: Session) -> None:
+    _vacuum("incident")
+    plan = _explain(
+        db,
+        "SELECT owner_id, updated_at, last_activity_at, comment_count "
+        "FROM incident WHERE id = :id",
+        id=uuid.uuid4(),
+    )
+    assert "Index Only Scan using ix_incident_id_version" in plan
+
+
+def test_comment_versions_lookup_is_index_only(db: Session) -> None:
+    _vacuum("comment")
+    plan = _explain(
+        db,
+        "SELECT count(*), max(updated_at) FROM comment "
+        "WHERE incident_id = :incident_id",
+        incident_id=uuid.uuid4(),
+    )
+    assert "Index Only Scan using ix_comment_incident_id_updated_at" in plan
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc
+
+from app.core.db import TimedQueuePool, pool_stats, track_pool
+
+
+def _pool() -> TimedQueuePool:
+    pool = TimedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01
+    )
+    track_pool(pool)
+    return pool
+
+
+def test_pool_tracks_checked_out_connections() -> None:
+    pool = _pool()
+    checkouts = pool_stats.checkouts
+    checked_out = pool_stats.checked_out
+    connection = pool.connect()
+    assert pool_stats.checkouts == checkouts + 1
+    assert pool_stats.checked_out == checked_out + 1
+    connection.close()
+    assert pool_stats.checked_out == checked_out
+
+
+def test_pool_records_checkout_timeouts() -> None:
+    pool = _pool()
+    timeouts = pool_stats.timeouts
+    connection = pool.connect()
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    assert pool_stats.timeouts == timeouts + 1
+    assert pool_stats.wait_seconds_max >= 0.01
+    connection.close()
@@ -0,0 +1,164 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.incident_events import (
+    STREAM_CLOSED,
+    IncidentEventBroker,
+    latest_event_position,
+    load_events,
+)
+from app.models import Incident, IncidentEvent, IncidentEventKind, UserAuth
+from tests.utils.comment import create_random_comment
+from tests.utils.incident import create_random_incident
+from tests.utils.user import create_random_user
+from tests.utils.utils import random_lower_string
+
+
+async def _listening(self: IncidentEventBroker) -> None:
+    self._listening.set()
+    await asyncio.Event().wait()
+
+
+class _Connection:
+    """Stands in for the LISTEN connection; never receives a notification."""
+
+    async def __aenter__(self) -> "_Connection":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    async def execute(self, _query: str) -> None:
+        return None
+
+    async def notifies(self, **_: object) -> AsyncIterator[None]:
+        await asyncio.Event().wait()
+        yield
+
+
+def _event(id: int, owner_id: uuid.UUID) -> IncidentEvent:
+    return IncidentEvent(
+        id=id,
+        kind=IncidentEventKind.INCIDENT_CREATED,
+        incident_id=uuid.uuid4(),
+        owner_id=owner_id,
+    )
+
+
+def test_broker_fans_out_to_subscribers() -> None:
+    async def run() -> None:
+        broker = IncidentEventBroker(
+            queue_size=10, prune_interval=3600, poll_interval=1
+        )
+        async with broker.subscribe() as first, broker.subscribe() as second:
+            event = _event(1, uuid.uuid4())
+            broker.publish(event)
+            assert first.get_nowait() is event
+            assert second.get_nowait() is event
+
+    with patch.object(IncidentEventBroker, "_listen", _listening):
+        asyncio.run(run())
+
+
+def test_broker_closes_slow_subscriber() -> None:
+    async def run() -> None:
+        broker = IncidentEventBroker(queue_size=2, prune_interval=3600, poll_interval=1)
+        async with broker.subscribe() as slow:
+            for id in range(3):
+                broker.publish(_event(id, uuid.uuid4()))
+            assert slow.get_nowait() is STREAM_CLOSED
+            assert slow.empty()
+
+    with patch.object(IncidentEventBroker, "_listen", _listening):
+        asyncio.run(run())
+
+
+def test_broker_reconnects_after_database_error() -> None:
+    connects = []
+    catch_ups = []
+
+    async def connect(*_: object, **__: object) -> _Connection:
+        connects.append(True)
+        return _Connection()
+
+    async def catch_up(_self: IncidentEventBroker) -> None:
+        catch_ups.append(True)
+        if len(catch_ups) == 1:
+            raise OperationalError("SELECT", {}, Exception("connection lost"))
+
+    async def no_prune(_self: IncidentEventBroker) -> None:
+        return None
+
+    async def run() -> None:
+        broker = IncidentEventBroker(queue_size=2, prune_interval=3600, poll_interval=1)
+        broker.reconnect_delay = 0
+        async with broker.subscribe() as queue:
+            assert queue.empty()
+            assert len(connects) == 2
+
+    with (
+        patch("psycopg.AsyncConnection.connect", connect),
+        patch.object(IncidentEventBroker, "_catch_up", catch_up),
+        patch.object(IncidentEventBroker, "_prune_if_due", no_prune),
+    ):
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_broker_closes_subscribers_when_listener_fails() -> None:
+    async def connect(*_: object, **__: object) -> _Connection:
+        raise RuntimeError("listener bug")
+
+    async def run() -> None:
+        broker = IncidentEventBroker(queue_size=2, prune_interval=3600, poll_interval=1)
+        # Released instead of waiting for a LISTEN that never happens
+        async with broker.subscribe() as queue:
+            assert queue.get_nowait() is STREAM_CLOSED
+
+    with patch("psycopg.AsyncConnection.connect", connect):
+        asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+
+def test_triggers_log_visible_events(db: Session) -> None:
+    start = latest_event_position() or (0, 0)
+    incident = create_random_incident(db)
+    comment = create_random_comment(
+        db, incident_id=incident.id, author_id=incident.owner_id
+    )
+    other = create_random_incident(db)
+
+    owner = UserAuth(id=incident.owner_id, is_active=True, is_superuser=False)
+    events = load_events(start, user=owner)
+    assert [(event.kind, event.incident_id, event.comment_id) for event in events] == [
+        (IncidentEventKind.INCIDENT_CREATED, incident.id, None),
+        (IncidentEventKind.COMMENT_CREATED, incident.id, comment.id),
+    ]
+
+    superuser = UserAuth(id=uuid.uuid4(), is_active=True, is_superuser=True)
+    incident_ids = {event.incident_id for event in load_events(start, user=superuser)}
+    assert other.id in incident_ids
+
+
+def test_load_events_holds_back_behind_running_transactions(db: Session) -> None:
+    start = latest_event_position() or (0, 0)
+    superuser = UserAuth(id=uuid.uuid4(), is_active=True, is_superuser=True)
+    owner = create_random_user(db)
+    with Session(engine) as slow:
+        # Draws the lower event id but commits last
+        held = Incident(title=random_lower_string(), owner_id=owner.id)
+        slow.add(held)
+        slow.flush()
+        held_id = held.id
+        committed = create_random_incident(db)
+        visible = {event.incident_id for event in load_events(start, user=superuser)}
+        assert held_id not in visible
+        assert committed.id not in visible
+        slow.commit()
+
+    incident_ids = [event.incident_id for event in load_events(start, user=superuser)]
+    assert incident_ids.index(held_id) < incident_ids.index(committed.id)
@@ -0,0 +1,104 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, track_queries
+from app.main import custom_generate_unique_id
+
+
+def _sample(metrics: str, name: str, **labels: str) -> float:
+    if labels:
+        name += "{" + ",".join(f'{k}="{v}"' for k, v in labels.items()) + "}"
+    for line in metrics.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def _scrape(client: TestClient) -> str:
+    with patch("app.core.config.settings.METRICS_TOKEN", "scrape-token"):
+        r = client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    return r.text
+
+
+def test_metrics_require_token(client: TestClient) -> None:
+    assert client.get("/metrics").status_code == 404
+    with patch("app.core.config.settings.METRICS_TOKEN", ""):
+        r = client.get("/metrics", headers={"Authorization": "Bearer "})
+        assert r.status_code == 404
+    with patch("app.core.config.settings.METRICS_TOKEN", "scrape-token"):
+        r = client.get("/metrics")
+        assert r.status_code == 401
+        assert r.headers["www-authenticate"] == "Bearer"
+        r = client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+        assert r.status_code == 401
+
+
+def test_metrics_record_route_latency_and_queries(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=normal_user_token_headers)
+    assert r.status_code == 200
+
+    metrics = _scrape(client)
+    route = "users-read_user_me"
+    assert (
+        _sample(metrics, "http_requests_total", method="GET", route=route, status="200")
+        >= 1
+    )
+    assert (
+        _sample(
+            metrics, "http_request_duration_seconds_count", method="GET", route=route
+        )
+        >= 1
+    )
+    assert _sample(metrics, "db_queries_per_request_count", route=route) >= 1
+    assert _sample(metrics, "db_query_duration_seconds_count") >= 1
+    assert _sample(metrics, "db_pool_checkouts_total") >= 1
+
+
+def test_metrics_label_unknown_paths_as_unmatched(client: TestClient) -> None:
+    client.get("/no-such-path")
+    metrics = _scrape(client)
+    assert (
+        _sample(
+            metrics,
+            "http_requests_total",
+            method="GET",
+            route="unmatched",
+            status="404",
+        )
+        >= 1
+    )
+
+
+def test_metrics_flag_repeated_statements(caplog: pytest.LogCaptureFixture) -> None:
+    engine = create_engine("sqlite://")
+    track_queries(engine)
+    router = APIRouter(tags=["things"])
+
+    @router.get("/things/")
+    def read_things() -> list[int]:
+        with engine.connect() as connection:
+            return [
+                connection.execute(text("SELECT :n"), {"n": n}).scalar_one()
+                for n in range(settings.QUERY_REPEAT_THRESHOLD)
+            ]
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(MetricsMiddleware, route_name=custom_generate_unique_id)
+    with caplog.at_level(logging.WARNING, logger="app.core.metrics"):
+        r = TestClient(app).get("/things/")
+    assert r.status_code == 200
+    assert r.headers["Server-Timing"].endswith(
+        f'desc="{settings.QUERY_REPEAT_THRESHOLD} queries"'
+    )
+    assert "Possible N+1 in things-read_things" in caplog.text
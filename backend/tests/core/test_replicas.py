@@ -0,0 +1,73 @@
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.core.db import engine
+from app.core.replicas import (
+    READ_PRIMARY_COOKIE,
+    ReadYourWritesMiddleware,
+    ReplicaPool,
+    _record_write,
+    get_read_engine,
+)
+
+
+def _pool(*urls: str) -> ReplicaPool:
+    return ReplicaPool([create_engine(url) for url in urls], health_check_interval=60)
+
+
+def test_replica_pool_round_robin() -> None:
+    pool = _pool("sqlite://", "sqlite://")
+    first, second = pool.engines
+    assert [pool.choose() for _ in range(3)] == [first, second, first]
+
+
+def test_replica_pool_without_replicas() -> None:
+    assert _pool().choose() is None
+
+
+def test_read_your_writes_cookie() -> None:
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=60)
+
+    @app.get("/read")
+    def read() -> bool:
+        return get_read_engine() is engine
+
+    @app.post("/write")
+    def write() -> None:
+        _record_write()
+
+    with patch("app.core.replicas.replica_pool", _pool("sqlite://")):
+        client = TestClient(app)
+        assert client.get("/read").json() is False
+        r = client.post("/write")
+        assert READ_PRIMARY_COOKIE in r.cookies
+        # A fresh client stands in for another worker process
+        other = TestClient(app, cookies=dict(r.cookies))
+        assert other.get("/read").json() is True
+        expired = TestClient(app, cookies={READ_PRIMARY_COOKIE: str(time.time() - 1)})
+        assert expired.get("/read").json() is False
+
+
+def test_replica_pool_skips_failed_replica() -> None:
+    pool = _pool("sqlite:////nonexistent/replica.db", "sqlite://")
+    broken, healthy = pool.engines
+    try:
+        with broken.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except exc.OperationalError:
+        pass
+    assert [pool.choose() for _ in range(3)] == [healthy] * 3
+
+
+def test_replica_pool_probes_after_interval() -> None:
+    pool = _pool("sqlite://")
+    replica = pool.engines[0]
+    pool.mark_down(replica)
+    assert pool.choose() is None
+    with patch("app.core.replicas.time.monotonic", return_value=float("inf")):
+        assert pool.choose() is replica
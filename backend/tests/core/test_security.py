@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+from prometheus_client import REGISTRY
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.core.security import PasswordHashingBusyError, PasswordHashingPool
+
+
+def test_hashing_pool_records_stats() -> None:
+    pool = PasswordHashingPool(workers=0, max_pending=1)
+    assert pool.run(str.upper, "secret") == "SECRET"
+    assert pool.stats.completed == 1
+    assert pool.stats.in_flight == 0
+    assert pool.stats.total_seconds >= 0
+
+
+def test_hashing_pool_rejects_when_full() -> None:
+    pool = PasswordHashingPool(workers=0, max_pending=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait()
+
+    worker = threading.Thread(target=pool.run, args=(block,))
+    worker.start()
+    started.wait()
+    assert pool.stats.in_flight == 1
+    with pytest.raises(PasswordHashingBusyError):
+        pool.run(str.upper, "secret")
+    release.set()
+    worker.join()
+    assert pool.stats.rejected == 1
+    assert pool.stats.completed == 1
+    assert pool.run(str.upper, "secret") == "SECRET"
+
+
+def test_hashing_pool_counts_failures_separately() -> None:
+    pool = PasswordHashingPool(workers=0, max_pending=1)
+    with pytest.raises(ValueError):
+        pool.run(int, "not a number")
+    assert pool.stats.failed == 1
+    assert pool.stats.completed == 0
+    assert pool.stats.in_flight == 0
+
+
+def test_hashing_pool_exports_metrics() -> None:
+    pool = PasswordHashingPool(workers=0, max_pending=1)
+    name = "password_hash_duration_seconds_count"
+    before = REGISTRY.get_sample_value(name, {"outcome": "ok"}) or 0
+    pool.run(str.upper, "secret")
+    assert REGISTRY.get_sample_value(name, {"outcome": "ok"}) == before + 1
+    assert REGISTRY.get_sample_value("password_hash_in_flight") == 0
+
+
+def test_hashing_queue_must_leave_threads_free() -> None:
+    values = {
+        **settings.model_dump(exclude={"emails_enabled", "SQLALCHEMY_DATABASE_URI"}),
+        "THREADPOOL_SIZE": 40,
+        "PASSWORD_HASH_MAX_PENDING": 32,
+    }
+    with pytest.raises(ValidationError, match="at most a quarter of THREADPOOL_SIZE"):
+        Settings(**values)
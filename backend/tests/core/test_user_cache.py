@@ -0,0 +1,71 @@
+import uuid
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings, settings
+from app.core.user_cache import MemoryUserCache, SharedUserCache
+from app.models import UserAuth
+from tests.utils.cache import InMemoryKeyValueClient
+
+
+def _auth_user() -> UserAuth:
+    return UserAuth(id=uuid.uuid4(), is_active=True, is_superuser=False)
+
+
+def test_memory_cache_get_set_delete() -> None:
+    cache = MemoryUserCache(ttl=60, max_entries=10)
+    user = _auth_user()
+    assert cache.get(user.id) is None
+    cache.set(user)
+    assert cache.get(user.id) == user
+    cache.delete(user.id)
+    assert cache.get(user.id) is None
+
+
+def test_memory_cache_expires_entries() -> None:
+    cache = MemoryUserCache(ttl=60, max_entries=10)
+    user = _auth_user()
+    with patch("app.core.user_cache.time.monotonic", return_value=1000.0):
+        cache.set(user)
+    with patch("app.core.user_cache.time.monotonic", return_value=1059.0):
+        assert cache.get(user.id) == user
+    with patch("app.core.user_cache.time.monotonic", return_value=1060.0):
+        assert cache.get(user.id) is None
+
+
+def test_memory_cache_evicts_least_recently_used() -> None:
+    cache = MemoryUserCache(ttl=60, max_entries=2)
+    first, second, third = _auth_user(), _auth_user(), _auth_user()
+    cache.set(first)
+    cache.set(second)
+    assert cache.get(first.id) == first
+    cache.set(third)
+    assert cache.get(first.id) == first
+    assert cache.get(second.id) is None
+    assert cache.get(third.id) == third
+
+
+def test_shared_cache_is_coherent_across_workers() -> None:
+    client = InMemoryKeyValueClient()
+    worker_a = SharedUserCache(client, ttl=60)
+    worker_b = SharedUserCache(client, ttl=60)
+    user = _auth_user()
+    worker_a.set(user)
+    assert worker_b.get(user.id) == user
+    worker_b.delete(user.id)
+    assert worker_a.get(user.id) is None
+
+
+def test_redis_backend_requires_redis_package() -> None:
+    values = {
+        **settings.model_dump(exclude={"emails_enabled", "SQLALCHEMY_DATABASE_URI"}),
+        "USER_CACHE_BACKEND": "redis",
+        "USER_CACHE_REDIS_URL": "redis://localhost:6379/0",
+    }
+    with (
+        patch("importlib.util.find_spec", return_value=None),
+        pytest.raises(ValidationError, match="requires the redis package"),
+    ):
+        Settings(**values)
@@ -0,0 +1,103 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+from sqlmodel import Session
+
+from app.email_worker import DeliveryStats, SMTPConnection, claim_batch, deliver_batch
+from app.models import EmailOutbox, EmailStatus, get_datetime_utc
+from tests.utils.smtp import SMTPServerState, stub_smtp_server
+from tests.utils.utils import random_email
+
+
+@contextmanager
+def _smtp_settings(port: int) -> Iterator[None]:
+    with (
+        patch("app.core.config.settings.SMTP_HOST", "127.0.0.1"),
+        patch("app.core.config.settings.SMTP_PORT", port),
+        patch("app.core.config.settings.SMTP_TLS", False),
+        patch("app.core.config.settings.SMTP_SSL", False),
+        patch("app.core.config.settings.SMTP_USER", None),
+        patch("app.core.config.settings.EMAILS_FROM_EMAIL", "noreply@example.com"),
+    ):
+        yield
+
+
+def _enqueue(db: Session, email_to: str) -> EmailOutbox:
+    email = EmailOutbox(email_to=email_to, subject="Subject", html_content="<p>Hi</p>")
+    db.add(email)
+    db.commit()
+    return email
+
+
+def _deliver(db: Session, server: SMTPServerState) -> DeliveryStats:
+    stats = DeliveryStats()
+    connection = SMTPConnection(stats)
+    with _smtp_settings(server.port):
+        deliver_batch(db, connection, stats)
+        deliver_batch(db, connection, stats)
+    connection.close()
+    return stats
+
+
+def test_deliver_batch_reuses_connection(db: Session) -> None:
+    first = _enqueue(db, random_email())
+    second = _enqueue(db, random_email())
+    sample = ("email_deliveries_total", {"outcome": "sent"})
+    sent_before = REGISTRY.get_sample_value(*sample) or 0
+    with stub_smtp_server() as server:
+        stats = _deliver(db, server)
+    db.refresh(first)
+    db.refresh(second)
+    assert first.status == EmailStatus.SENT
+    assert second.status == EmailStatus.SENT
+    assert first.sent_at is not None
+    assert {first.email_to, second.email_to} <= {
+        recipient for email in server.emails for recipient in email.rcpt_to
+    }
+    assert server.connections == 1
+    assert stats.connects == 1
+    assert REGISTRY.get_sample_value(*sample) == sent_before + stats.sent
+
+
+def test_deliver_batch_fails_rejected_recipient(db: Session) -> None:
+    email = _enqueue(db, random_email())
+    with stub_smtp_server() as server:
+        server.rejected_recipients.add(email.email_to)
+        stats = _deliver(db, server)
+    db.refresh(email)
+    assert email.status == EmailStatus.FAILED
+    assert email.attempts == 1
+    assert stats.failed >= 1
+
+
+def test_deliver_batch_retries_with_backoff(db: Session) -> None:
+    email = _enqueue(db, random_email())
+    with stub_smtp_server() as server:
+        port = server.port
+    stats = DeliveryStats()
+    with _smtp_settings(port):
+        deliver_batch(db, SMTPConnection(stats), stats)
+    db.refresh(email)
+    assert email.status == EmailStatus.PENDING
+    assert email.attempts == 1
+    assert email.last_error
+    assert email.next_attempt_at > get_datetime_utc()
+    assert stats.retried >= 1
+
+
+def test_claim_batch_leases_emails(db: Session) -> None:
+    email = _enqueue(db, random_email())
+    assert email.id in {claimed.id for claimed in claim_batch(db)}
+    db.refresh(email)
+    assert email.status == EmailStatus.SENDING
+    assert email.attempts == 1
+    # Not claimed again until the lease runs out
+    assert email.next_attempt_at > get_datetime_utc()
+    assert email.id not in {claimed.id for claimed in claim_batch(db)}
+
+    email.next_attempt_at = get_datetime_utc()
+    db.add(email)
+    db.commit()
+    assert email.id in {claimed.id for claimed in claim_batch(db)}
@@ -0,0 +1,24 @@
+from jinja2 import Template
+
+from app.utils import (
+    EMAIL_TEMPLATES_DIR,
+    get_email_environment,
+    render_email_template,
+)
+
+
+def test_email_templates_are_compiled_once() -> None:
+    environment = get_email_environment()
+    assert get_email_environment() is environment
+    template = environment.get_template("test_email.html")
+    assert environment.get_template("test_email.html") is template
+
+
+def test_render_email_template_matches_source() -> None:
+    context = {"project_name": "Incident Tracker", "email": "user@example.com"}
+    source = (EMAIL_TEMPLATES_DIR / "test_email.html").read_text()
+    html_content = render_email_template(
+        template_name="test_email.html", context=context
+    )
+    assert html_content == Template(source).render(context)
+    assert "user@example.com" in html_content
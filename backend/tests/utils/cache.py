@@ -0,0 +1,27 @@
+import time
+from typing import Any
+
+
+class InMemoryKeyValueClient:
+    """Stand-in for a shared redis-py client, keeping values in a dict."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, tuple[float | None, str]] = {}
+
+    def get(self, name: str) -> str | None:
+        entry = self.values.get(name)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[name]
+            return None
+        return value
+
+    def set(self, name: str, value: str, ex: int | None = None) -> Any:
+        expires_at = time.monotonic() + ex if ex is not None else None
+        self.values[name] = (expires_at, value)
+        return True
+
+    def delete(self, *names: str) -> Any:
+        return sum(self.values.pop(name, None) is not None for name in names)
@@ -0,0 +1,63 @@
+from collections import Counter
+from collections.abc import Generator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import Engine, event
+
+from app.core.async_db import async_engine
+from app.core.config import settings
+from app.core.db import engine
+from app.core.replicas import replica_pool
+from app.core.user_cache import DisabledUserCache, get_user_cache, set_user_cache
+
+
+def _engines() -> list[Engine]:
+    # Every engine a request can run statements on: the primary, the async
+    # routes' engine and the read replicas
+    return [engine, async_engine.sync_engine, *replica_pool.engines]
+
+
+@contextmanager
+def query_budget(queries: int) -> Generator[list[str], None, None]:
+    """
+    Fail unless the block runs exactly ``queries`` statements, or if it runs
+    one statement often enough to look like an N+1.
+
+    Pins an endpoint's query count, so a change that adds round-trips fails
+    the test instead of slipping through, and one that removes them updates
+    the budget:
+
+        with query_budget(3):
+            client.get(...)
+
+    The auth user cache is off inside the block, so the current user's lookup
+    is always one of the statements.
+    """
+    statements: list[str] = []
+
+    def _record(_conn: Any, _cursor: Any, statement: str, *_: Any) -> None:
+        statements.append(statement)
+
+    engines = _engines()
+    user_cache = get_user_cache()
+    set_user_cache(DisabledUserCache())
+    for target in engines:
+        event.listen(target, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", _record)
+        set_user_cache(user_cache)
+
+    listing = "\n".join(statements)
+    assert len(statements) == queries, (
+        f"{len(statements)} queries, budget is {queries}:\n{listing}"
+    )
+    repeated = [
+        statement
+        for statement, times in Counter(statements).items()
+        if times >= settings.QUERY_REPEAT_THRESHOLD
+    ]
+    assert not repeated, f"Statements repeated like an N+1:\n{listing}"
@@ -0,0 +1,84 @@
+import socketserver
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ReceivedEmail:
+    mail_from: str
+    rcpt_to: list[str]
+    data: str
+
+
+@dataclass
+class SMTPServerState:
+    host: str = "127.0.0.1"
+    port: int = 0
+    rejected_recipients: set[str] = field(default_factory=set)
+    emails: list[ReceivedEmail] = field(default_factory=list)
+    connections: int = 0
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    state: SMTPServerState
+
+    def _reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.state.connections += 1
+        self._reply("220 localhost stub SMTP")
+        mail_from = ""
+        rcpt_to: list[str] = []
+        while line := self.rfile.readline().decode():
+            command = line.strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self._reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from = command.split(":", 1)[1].strip(" <>")
+                rcpt_to = []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                recipient = command.split(":", 1)[1].strip(" <>")
+                if recipient in self.state.rejected_recipients:
+                    self._reply("550 No such user")
+                else:
+                    rcpt_to.append(recipient)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while (data_line := self.rfile.readline().decode()) != ".\r\n":
+                    lines.append(data_line)
+                self.state.emails.append(
+                    ReceivedEmail(
+                        mail_from=mail_from, rcpt_to=rcpt_to, data="".join(lines)
+                    )
+                )
+                self._reply("250 OK")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+@contextmanager
+def stub_smtp_server() -> Iterator[SMTPServerState]:
+    """Run a minimal SMTP server in a thread that records accepted emails."""
+    state = SMTPServerState()
+    handler = type("Handler", (_SMTPHandler,), {"state": state})
+    with socketserver.ThreadingTCPServer((state.host, 0), handler) as server:
+        server.daemon_threads = True
+        state.port = server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield state
+        finally:
+            server.shutdown()